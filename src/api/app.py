@@ -2,12 +2,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.config.settings import Settings
+from src.api.responses import ORJSONResponse
 
 def create_app(settings: Settings) -> FastAPI:
     app = FastAPI(
         title=settings.APP_NAME,
         version=settings.VERSION,
         docs_url="/docs" if settings.DEBUG else None,
+        default_response_class=ORJSONResponse,
     )
     
     # Add CORS middleware
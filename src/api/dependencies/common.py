@@ -1,21 +1,14 @@
 """Common API dependencies"""
-from functools import lru_cache
 from typing import AsyncGenerator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config.settings import Settings
+from src.config.settings import Settings, get_settings
 from src.database.connection import get_db_manager as _get_db_manager, DatabaseManager
 from src.cache.redis_client import get_redis_cache, RedisCache
 from src.llm.sql_generator import SQLGenerator
 
 
-@lru_cache()
-def get_settings() -> Settings:
-    """Get application settings (cached)"""
-    return Settings()
-
-
 def get_db_manager(settings: Settings = Depends(get_settings)) -> DatabaseManager:
     """Get database manager instance"""
     return _get_db_manager(settings)
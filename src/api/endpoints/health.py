@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, status
 
 from src.models.schemas import HealthCheckResponse
 from src.api.dependencies import get_settings, get_db_manager, get_cache, get_sql_generator
+from src.api.responses import model_response
 from src.config.settings import Settings
 from src.database.connection import DatabaseManager
 from src.cache.redis_client import RedisCache
@@ -14,7 +15,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Health"])
 
 
-@router.get("/health", response_model=HealthCheckResponse, status_code=status.HTTP_200_OK)
+@router.get(
+    "/health",
+    response_model=None,
+    responses={200: {"model": HealthCheckResponse}},
+    status_code=status.HTTP_200_OK,
+)
 async def health_check(
     settings: Settings = Depends(get_settings),
     db_manager: DatabaseManager = Depends(get_db_manager),
@@ -65,11 +71,11 @@ async def health_check(
     all_healthy = all(services.values())
     overall_status = "healthy" if all_healthy else "degraded"
 
-    return HealthCheckResponse(
+    return model_response(HealthCheckResponse(
         status=overall_status,
         version=settings.VERSION,
         services=services,
-    )
+    ))
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
@@ -7,7 +7,7 @@ import logging
 from src.database.connection import get_db
 from src.database.models import LearnedCorrection
 from src.llm.correction_learner import CorrectionLearner
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +32,7 @@ class LearnedCorrectionResponse(BaseModel):
     learned_at: str
     last_applied_at: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class LearningStatsResponse(BaseModel):
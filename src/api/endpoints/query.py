@@ -14,8 +14,10 @@ from src.models.schemas import (
     ExplainResponse,
     QueryHistoryResponse,
     StatsResponse,
+    QUERY_HISTORY_LIST_ADAPTER,
 )
 from src.api.dependencies import get_db, get_cache, get_sql_generator, get_settings
+from src.api.responses import model_response, json_bytes_response
 from src.database.models import QueryHistory
 from src.llm.sql_generator import SQLGenerator
 from src.llm.self_correcting_agent import SelfCorrectingSQLAgent
@@ -29,7 +31,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/query", tags=["Query"])
 
 
-@router.post("/", response_model=QueryResponse, status_code=status.HTTP_200_OK)
+@router.post(
+    "/",
+    response_model=None,
+    responses={200: {"model": QueryResponse}},
+    status_code=status.HTTP_200_OK,
+)
 async def process_query(
     request: QueryRequest,
     db: AsyncSession = Depends(get_db),
@@ -49,7 +56,10 @@ async def process_query(
     """
     try:
         # Generate cache key
-        cache_key_data = f"{request.question}:{request.database_type}"
+        cache_key_data = (
+            f"{request.question}:{request.database_type}:"
+            f"{request.model}:{request.allow_write}"
+        )
         cache_key_hash = hashlib.sha256(cache_key_data.encode()).hexdigest()[:16]
         cache_key = f"query:{cache_key_hash}"
 
@@ -62,8 +72,11 @@ async def process_query(
             cached_result = await cache.get(cache_key)
             if cached_result:
                 logger.info(f"Cache hit for query: {request.question[:50]}...")
-                cached_result["cached"] = True
-                return QueryResponse(**cached_result)
+                # Entries were built by this endpoint; skip re-validation.
+                # Copy rather than mutate: the dict may be shared with the local cache.
+                return model_response(
+                    QueryResponse.model_construct(**{**cached_result, "cached": True})
+                )
 
         # Cache miss - generate SQL
         logger.info(f"Processing query: {request.question}")
@@ -94,9 +107,9 @@ async def process_query(
         async with UserDatabaseConnector.get_user_db_session(active_connection) as user_db:
             # Get actual database schema from USER's database
             schema_inspector = SchemaInspector()
-            if request.schema:
+            if request.schema_info:
                 # Use provided schema
-                schema = request.schema
+                schema = request.schema_info
             else:
                 # Auto-introspect schema from user's database
                 schema_data = await schema_inspector.get_full_schema(user_db)
@@ -104,21 +117,20 @@ async def process_query(
                 logger.debug(f"Using introspected schema with {len(schema_data['tables'])} tables")
 
             # Use Self-Correcting Agent for automatic error recovery
-            self_correcting_agent = SelfCorrectingSQLAgent(
+            async with SelfCorrectingSQLAgent(
                 sql_generator=sql_generator,
                 max_retries=3,
                 enable_diagnostics=True
-            )
-
-            # Generate and execute with automatic retry
-            agent_result = await self_correcting_agent.generate_and_execute_with_retry(
-                question=request.question,
-                schema=schema,
-                session=user_db,
-                database_type=database_type,
-                allow_write=request.allow_write,
-                model=request.model,
-            )
+            ) as self_correcting_agent:
+                # Generate and execute with automatic retry
+                agent_result = await self_correcting_agent.generate_and_execute_with_retry(
+                    question=request.question,
+                    schema=schema,
+                    session=user_db,
+                    database_type=database_type,
+                    allow_write=request.allow_write,
+                    model=request.model,
+                )
 
             # Extract results from agent
             sql = agent_result["sql"]
@@ -193,7 +205,10 @@ async def process_query(
         if request.use_cache and is_valid:
             await cache.set(cache_key, response_data, ttl=settings.CACHE_TTL)
 
-        return QueryResponse(**response_data)
+        # response_data is assembled above from executor output with the
+        # model's field types, so skip validating every result row (up to
+        # max_rows dicts); the serializer encodes the rows in one pass
+        return model_response(QueryResponse.model_construct(**response_data))
 
     except Exception as e:
         logger.error(f"Query processing error: {e}", exc_info=True)
@@ -203,7 +218,7 @@ async def process_query(
         )
 
 
-@router.post("/explain", response_model=ExplainResponse)
+@router.post("/explain", response_model=None, responses={200: {"model": ExplainResponse}})
 async def explain_sql(
     request: ExplainRequest,
     db: AsyncSession = Depends(get_db),
@@ -217,8 +232,8 @@ async def explain_sql(
             await sql_generator.initialize()
 
         # Get actual schema if not provided
-        if request.schema:
-            schema = request.schema
+        if request.schema_info:
+            schema = request.schema_info
         else:
             schema_inspector = SchemaInspector()
             schema_data = await schema_inspector.get_full_schema(db)
@@ -229,10 +244,10 @@ async def explain_sql(
             schema=schema,
         )
 
-        return ExplainResponse(
+        return model_response(ExplainResponse(
             sql=request.sql,
             explanation=explanation,
-        )
+        ))
 
     except Exception as e:
         logger.error(f"SQL explanation error: {e}", exc_info=True)
@@ -242,7 +257,7 @@ async def explain_sql(
         )
 
 
-@router.get("/history", response_model=List[QueryHistoryResponse])
+@router.get("/history", response_model=None, responses={200: {"model": List[QueryHistoryResponse]}})
 async def get_query_history(
     limit: int = 50,
     offset: int = 0,
@@ -262,7 +277,10 @@ async def get_query_history(
         result = await db.execute(stmt)
         queries = result.scalars().all()
 
-        return [QueryHistoryResponse.model_validate(q) for q in queries]
+        # Validate ORM rows and serialize in one pass each, skipping
+        # FastAPI's per-item re-validation of the response model
+        history = QUERY_HISTORY_LIST_ADAPTER.validate_python(queries, from_attributes=True)
+        return json_bytes_response(QUERY_HISTORY_LIST_ADAPTER.dump_json(history))
 
     except Exception as e:
         logger.error(f"Error fetching query history: {e}", exc_info=True)
@@ -272,7 +290,7 @@ async def get_query_history(
         )
 
 
-@router.get("/history/{query_id}", response_model=QueryHistoryResponse)
+@router.get("/history/{query_id}", response_model=None, responses={200: {"model": QueryHistoryResponse}})
 async def get_query_by_id(
     query_id: int,
     db: AsyncSession = Depends(get_db),
@@ -291,7 +309,7 @@ async def get_query_by_id(
                 detail=f"Query with ID {query_id} not found"
             )
 
-        return QueryHistoryResponse.model_validate(query)
+        return model_response(QueryHistoryResponse.model_validate(query))
 
     except HTTPException:
         raise
@@ -303,7 +321,7 @@ async def get_query_by_id(
         )
 
 
-@router.get("/stats", response_model=StatsResponse)
+@router.get("/stats", response_model=None, responses={200: {"model": StatsResponse}})
 async def get_stats(
     db: AsyncSession = Depends(get_db),
 ):
@@ -335,12 +353,12 @@ async def get_stats(
             {"query": row[0], "count": row[1]} for row in result.all()
         ]
 
-        return StatsResponse(
+        return model_response(StatsResponse(
             total_queries=total_queries,
             cached_queries=0,  # Would query Redis for this
             average_execution_time_ms=float(avg_time) if avg_time else None,
             top_queries=top_queries,
-        )
+        ))
 
     except Exception as e:
         logger.error(f"Error fetching stats: {e}", exc_info=True)
@@ -4,7 +4,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 from src.models.schemas import QueryRequest
 from src.api.dependencies import get_db, get_sql_generator
@@ -24,9 +24,11 @@ class VerifyResultRequest(BaseModel):
     """Request model for result verification"""
     question: str
     sql: str
-    schema: Optional[str] = None
+    schema_info: Optional[str] = Field(default=None, alias="schema")
     database_type: str = "postgresql"
 
+    model_config = ConfigDict(populate_by_name=True)
+
 
 class VerifyResultResponse(BaseModel):
     """Response model for result verification"""
@@ -44,9 +46,11 @@ class ManualVerifyRequest(BaseModel):
     question: str
     sql: str
     result: dict  # The execution result
-    schema: Optional[str] = None
+    schema_info: Optional[str] = Field(default=None, alias="schema")
     database_type: str = "postgresql"
 
+    model_config = ConfigDict(populate_by_name=True)
+
 
 @router.post("/result", response_model=VerifyResultResponse, status_code=status.HTTP_200_OK)
 async def verify_query_result(
@@ -75,7 +79,7 @@ async def verify_query_result(
             question=request.question,
             sql=request.sql,
             result=request.result,
-            schema=request.schema or "{}",
+            schema=request.schema_info or "{}",
             database_type=request.database_type
         )
 
@@ -144,12 +148,12 @@ async def execute_and_verify_query(
         # Connect to user's database
         async with UserDatabaseConnector.get_user_db_session(active_connection) as user_db:
             # Get schema if not provided
-            if not request.schema:
+            if not request.schema_info:
                 schema_inspector = SchemaInspector()
                 schema_data = await schema_inspector.get_full_schema(user_db)
                 schema = schema_inspector.format_schema_for_llm(schema_data)
             else:
-                schema = request.schema
+                schema = request.schema_info
 
             # Execute the query
             executor = SQLExecutor(max_rows=1000, timeout_seconds=30)
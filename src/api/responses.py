@@ -0,0 +1,69 @@
+"""JSON response classes for the API"""
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+# Serialize responses with orjson when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Convert values orjson cannot serialize natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (UUID, bytes)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    class ORJSONResponse(JSONResponse):
+        """JSONResponse rendered with orjson (datetimes, UUIDs, Decimals, models)"""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(
+                content,
+                default=_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+else:
+    ORJSONResponse = JSONResponse  # type: ignore[misc,assignment]
+
+
+def json_bytes_response(body: bytes, status_code: int = 200) -> Response:
+    """
+    Wrap JSON bytes already produced by a pydantic serializer
+
+    Args:
+        body: Serialized JSON (e.g. from TypeAdapter.dump_json)
+        status_code: HTTP status code
+
+    Returns:
+        Response with application/json media type
+    """
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """
+    Return a response model as JSON, skipping FastAPI's response re-validation
+
+    The model's own pydantic-core serializer writes JSON bytes directly,
+    without building an intermediate dict.
+
+    Args:
+        model: Already validated response model
+        status_code: HTTP status code
+
+    Returns:
+        Response with the serialized model
+    """
+    return json_bytes_response(model.__pydantic_serializer__.to_json(model), status_code)
@@ -5,6 +5,8 @@ import logging
 from typing import Any, Optional
 from datetime import timedelta
 
+from cachetools import TTLCache
+
 try:
     import redis.asyncio as aioredis
     from redis.asyncio import Redis
@@ -16,10 +18,22 @@ except ImportError:
     RedisError = Exception
     RedisConnectionError = Exception
 
-from src.config.settings import Settings
+from src.config.settings import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+# Cache entries are encoded/decoded on every hit, so use orjson when available
+try:
+    import orjson
+
+    def _json_dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 
 class RedisCache:
     """Redis cache manager with connection pooling"""
@@ -28,6 +42,10 @@ class RedisCache:
         self.settings = settings
         self.redis: Optional[Redis] = None
         self._connection_pool = None
+        # Short-lived in-process layer so repeated hits skip the Redis round-trip
+        self._local: TTLCache = TTLCache(
+            maxsize=settings.LOCAL_CACHE_SIZE, ttl=settings.LOCAL_CACHE_TTL
+        )
 
     async def connect(self):
         """Initialize Redis connection pool"""
@@ -95,6 +113,10 @@ class RedisCache:
         Returns:
             Cached value (deserialized from JSON) or None if not found
         """
+        if key in self._local:
+            logger.debug(f"Local cache hit: {key}")
+            return self._local[key]
+
         try:
             if not self.redis:
                 logger.warning("Redis not connected")
@@ -103,7 +125,9 @@ class RedisCache:
             value = await self.redis.get(key)
             if value:
                 logger.debug(f"Cache hit: {key}")
-                return json.loads(value)
+                value = _json_loads(value)
+                self._local[key] = value
+                return value
 
             logger.debug(f"Cache miss: {key}")
             return None
@@ -142,10 +166,11 @@ class RedisCache:
                 ttl = self.settings.CACHE_TTL
 
             # Serialize value to JSON
-            serialized = json.dumps(value)
+            serialized = _json_dumps(value)
 
             # Set with expiration
             await self.redis.setex(key, ttl, serialized)
+            self._local[key] = value
             logger.debug(f"Cache set: {key} (TTL: {ttl}s)")
             return True
 
@@ -166,6 +191,8 @@ class RedisCache:
         Returns:
             True if deleted, False otherwise
         """
+        self._local.pop(key, None)
+
         try:
             if not self.redis:
                 logger.warning("Redis not connected")
@@ -219,6 +246,7 @@ class RedisCache:
             deleted_count = 0
             async for key in self.redis.scan_iter(match=pattern):
                 await self.redis.delete(key)
+                self._local.pop(key, None)
                 deleted_count += 1
 
             logger.info(f"Cleared {deleted_count} keys matching pattern: {pattern}")
@@ -239,6 +267,8 @@ class RedisCache:
         Returns:
             New value after increment, or None on error
         """
+        self._local.pop(key, None)
+
         try:
             if not self.redis:
                 return None
@@ -278,7 +308,7 @@ def get_redis_cache(settings: Optional[Settings] = None) -> RedisCache:
 
     if _redis_cache is None:
         if settings is None:
-            settings = Settings()
+            settings = get_settings()
         _redis_cache = RedisCache(settings)
 
     return _redis_cache
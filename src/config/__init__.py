@@ -1,4 +1,4 @@
 """Configuration package for Database Guru"""
-from src.config.settings import Settings
+from src.config.settings import Settings, get_settings
 
-__all__ = ["Settings"]
+__all__ = ["Settings", "get_settings"]
@@ -1,5 +1,6 @@
 """Application settings"""
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 import os
 
@@ -28,15 +29,15 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     CACHE_TTL: int = 3600
+    LOCAL_CACHE_SIZE: int = 1024  # In-process layer in front of Redis
+    LOCAL_CACHE_TTL: int = 30
 
     # SQL Execution
     MAX_QUERY_ROWS: int = 1000
     QUERY_TIMEOUT_SECONDS: int = 30
     ALLOW_WRITE_OPERATIONS: bool = False  # Safety: disable writes by default
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
     @property
     def ollama_url(self) -> str:
@@ -48,3 +49,9 @@ class Settings(BaseSettings):
 
         # Default to local Ollama installation
         return "http://localhost:11434"
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get application settings (parsed from the environment once)"""
+    return Settings()
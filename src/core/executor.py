@@ -376,9 +376,11 @@ class SQLExecutor:
 
         # Check for write operations if not allowed
         if not self.allow_write:
+            # Pad once rather than building a padded copy per keyword
+            padded = f' {sql_upper} '
             write_keywords = ['INSERT', 'UPDATE', 'DELETE', 'DROP', 'TRUNCATE', 'ALTER', 'CREATE']
             for keyword in write_keywords:
-                if f' {keyword} ' in f' {sql_upper} ' or sql_upper.startswith(keyword):
+                if f' {keyword} ' in padded or sql_upper.startswith(keyword):
                     return False, f"Write operation not allowed: {keyword}"
 
         # Check for dangerous operations (always blocked)
@@ -228,32 +228,31 @@ class MultiDatabaseHandler:
                     schema_data = await self.schema_inspector.get_full_schema(user_db)
                     schema = self._format_single_db_schema(schema_data)
 
-                # Initialize self-correcting agent
-                agent = SelfCorrectingSQLAgent(
+                # Initialize self-correcting agent (closed before the session is)
+                async with SelfCorrectingSQLAgent(
                     sql_generator=sql_generator,
                     max_retries=max_retries,
                     enable_diagnostics=True,
-                )
-
-                # If initial SQL provided, use direct retry approach
-                if initial_sql:
-                    # Execute with retry logic
-                    result = await agent.execute_with_retry(
-                        sql=initial_sql,
-                        schema=schema,
-                        session=user_db,
-                        database_type=connection.database_type,
-                        question=question,
-                    )
-                else:
-                    # Generate SQL and execute with retry
-                    result = await agent.generate_and_execute_with_retry(
-                        question=question,
-                        schema=schema,
-                        session=user_db,
-                        database_type=connection.database_type,
-                        allow_write=allow_write,
-                    )
+                ) as agent:
+                    # If initial SQL provided, use direct retry approach
+                    if initial_sql:
+                        # Execute with retry logic
+                        result = await agent.execute_with_retry(
+                            sql=initial_sql,
+                            schema=schema,
+                            session=user_db,
+                            database_type=connection.database_type,
+                            question=question,
+                        )
+                    else:
+                        # Generate SQL and execute with retry
+                        result = await agent.generate_and_execute_with_retry(
+                            question=question,
+                            schema=schema,
+                            session=user_db,
+                            database_type=connection.database_type,
+                            allow_write=allow_write,
+                        )
 
                 # Add connection metadata
                 if result.get("success"):
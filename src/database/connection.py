@@ -7,7 +7,7 @@ from sqlalchemy.pool import NullPool, QueuePool
 from contextlib import asynccontextmanager, contextmanager
 import logging
 
-from src.config.settings import Settings
+from src.config.settings import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +40,7 @@ class DatabaseManager:
             max_overflow=20,
             pool_pre_ping=True,  # Verify connections before using
             pool_recycle=3600,   # Recycle connections after 1 hour
+            pool_use_lifo=True,  # Reuse warm connections; let spare overflow ones idle out
             echo=self.settings.DEBUG,  # Log SQL in debug mode
         )
 
@@ -69,6 +70,7 @@ class DatabaseManager:
             max_overflow=20,
             pool_pre_ping=True,
             pool_recycle=3600,
+            pool_use_lifo=True,
             echo=self.settings.DEBUG,
         )
 
@@ -174,7 +176,7 @@ def get_db_manager(settings: Settings | None = None) -> DatabaseManager:
 
     if _db_manager is None:
         if settings is None:
-            settings = Settings()
+            settings = get_settings()
         _db_manager = DatabaseManager(settings)
 
     return _db_manager
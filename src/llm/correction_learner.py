@@ -1,16 +1,34 @@
 """Learning system for SQL corrections"""
 import logging
 import re
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc
+from cachetools import TTLCache
 
 from src.database.models import LearnedCorrection
 from src.llm.self_correcting_agent import ErrorType
 
 logger = logging.getLogger(__name__)
 
+# Error text is normalized and scanned for names on every learn/lookup
+_DOUBLE_QUOTED_RE = re.compile(r'"[^"]*"')
+_SINGLE_QUOTED_RE = re.compile(r"'[^']*'")
+_NUMBER_RE = re.compile(r'\b\d+\b')
+
+# Tried in order; the first pattern that matches wins
+_TABLE_NAME_PATTERNS = tuple(re.compile(p) for p in (
+    r'table["\s]+([a-z_][a-z0-9_]*)',
+    r'relation["\s]+([a-z_][a-z0-9_]*)',
+    r'no such table:\s*([a-z_][a-z0-9_]*)',
+))
+_COLUMN_NAME_PATTERNS = tuple(re.compile(p) for p in (
+    r'column["\s]+([a-z_][a-z0-9_]*)',
+    r'field["\s]+([a-z_][a-z0-9_]*)',
+    r'no such column:\s*([a-z_][a-z0-9_]*)',
+))
+
 
 class CorrectionLearner:
     """
@@ -35,6 +53,10 @@ class CorrectionLearner:
         self.db_session = db_session
         self.enable_learning = enable_learning
 
+        # Lookups for this session keyed by exactly what find_applicable_corrections
+        # filters on: (error_type, database_type, table name, column name, limit)
+        self._lookup_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+
     async def learn_from_correction(
         self,
         error_type: ErrorType,
@@ -85,6 +107,7 @@ class CorrectionLearner:
                 existing.last_applied_at = datetime.utcnow()
                 existing.confidence_score = min(1.0, existing.confidence_score + 0.1)
                 self.db_session.commit()
+                self._invalidate_lookups(error_type)
                 logger.info(f"Updated existing correction {existing.id}, now applied {existing.times_applied} times")
                 return existing.id
 
@@ -107,6 +130,7 @@ class CorrectionLearner:
             self.db_session.add(correction)
             self.db_session.commit()
             self.db_session.refresh(correction)
+            self._invalidate_lookups(error_type)
 
             logger.info(f"Learned new correction {correction.id} for {error_type.value}")
             return correction.id
@@ -142,8 +166,12 @@ class CorrectionLearner:
 
         try:
             # Extract patterns from current error
-            table_match = self._extract_table_name(error_message)
-            column_match = self._extract_column_name(error_message)
+            table_match, column_match = self.match_patterns(error_message)
+
+            key = (error_type, database_type, table_match, column_match, limit)
+            cached = self._lookup_cache.get(key)
+            if cached is not None:
+                return cached
 
             # Build query for similar corrections
             query = self.db_session.query(LearnedCorrection).filter(
@@ -193,12 +221,19 @@ class CorrectionLearner:
                 })
 
             logger.info(f"Found {len(results)} applicable corrections for {error_type.value}")
+            self._lookup_cache[key] = results
             return results
 
         except Exception as e:
+            # Not cached, so the next lookup retries the query
             logger.error(f"Failed to find applicable corrections: {e}")
             return []
 
+    def _invalidate_lookups(self, error_type: ErrorType) -> None:
+        """Drop cached lookups for an error type"""
+        for key in [key for key in self._lookup_cache if key[0] == error_type]:
+            self._lookup_cache.pop(key, None)
+
     async def apply_learned_correction(
         self,
         correction_id: int,
@@ -295,25 +330,28 @@ class CorrectionLearner:
         error_lower = error_message.lower()
 
         # Replace quoted strings with placeholder
-        error_lower = re.sub(r'"[^"]*"', '"<name>"', error_lower)
-        error_lower = re.sub(r"'[^']*'", "'<name>'", error_lower)
+        error_lower = _DOUBLE_QUOTED_RE.sub('"<name>"', error_lower)
+        error_lower = _SINGLE_QUOTED_RE.sub("'<name>'", error_lower)
 
         # Replace numbers with placeholder
-        error_lower = re.sub(r'\b\d+\b', '<num>', error_lower)
+        error_lower = _NUMBER_RE.sub('<num>', error_lower)
 
         return error_lower
 
+    def match_patterns(self, error_message: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Table and column names that lookups for this error filter on
+
+        Returns:
+            (table name or None, column name or None)
+        """
+        return self._extract_table_name(error_message), self._extract_column_name(error_message)
+
     def _extract_table_name(self, error_message: str) -> Optional[str]:
         """Extract table name from error message"""
-        patterns = [
-            r'table["\s]+([a-z_][a-z0-9_]*)',
-            r'relation["\s]+([a-z_][a-z0-9_]*)',
-            r'no such table:\s*([a-z_][a-z0-9_]*)',
-        ]
-
         error_lower = error_message.lower()
-        for pattern in patterns:
-            match = re.search(pattern, error_lower)
+        for pattern in _TABLE_NAME_PATTERNS:
+            match = pattern.search(error_lower)
             if match:
                 return match.group(1)
 
@@ -321,15 +359,9 @@ class CorrectionLearner:
 
     def _extract_column_name(self, error_message: str) -> Optional[str]:
         """Extract column name from error message"""
-        patterns = [
-            r'column["\s]+([a-z_][a-z0-9_]*)',
-            r'field["\s]+([a-z_][a-z0-9_]*)',
-            r'no such column:\s*([a-z_][a-z0-9_]*)',
-        ]
-
         error_lower = error_message.lower()
-        for pattern in patterns:
-            match = re.search(pattern, error_lower)
+        for pattern in _COLUMN_NAME_PATTERNS:
+            match = pattern.search(error_lower)
             if match:
                 return match.group(1)
 
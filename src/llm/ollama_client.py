@@ -1,8 +1,9 @@
 """Ollama LLM client for Database Guru"""
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import httpx
-from src.config.settings import Settings
+from src.config.settings import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +16,24 @@ class OllamaClient:
         self.base_url = settings.OLLAMA_BASE_URL
         self.model = settings.OLLAMA_MODEL
         self.client: Optional[httpx.AsyncClient] = None
+        # In-flight non-streaming generations, keyed by request parameters
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
 
     async def connect(self):
-        """Initialize HTTP client"""
+        """Initialize HTTP client (no-op if already connected)"""
+        # Keep one pooled client for the process so requests reuse
+        # keep-alive connections instead of reconnecting
+        if self.client is not None and not self.client.is_closed:
+            return
+
         self.client = httpx.AsyncClient(
             base_url=self.base_url,
             timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0,
+            ),
         )
         logger.info(f"✅ Ollama client initialized: {self.base_url} (model: {self.model})")
 
@@ -28,6 +41,7 @@ class OllamaClient:
         """Close HTTP client"""
         if self.client:
             await self.client.aclose()
+            self.client = None
             logger.info("Ollama client disconnected")
 
     async def health_check(self) -> bool:
@@ -81,6 +95,38 @@ class OllamaClient:
         Returns:
             Generated text
         """
+        if stream:
+            return await self._generate(prompt, model, system, temperature, stream, **kwargs)
+
+        # Ollama has no batch endpoint, so identical concurrent requests
+        # (e.g. the same question submitted twice) share one HTTP call
+        try:
+            key = (prompt, model or self.model, system, temperature, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            return await self._generate(prompt, model, system, temperature, stream, **kwargs)
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self._generate(prompt, model, system, temperature, stream, **kwargs)
+            )
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller being cancelled doesn't cancel the others
+        return await asyncio.shield(future)
+
+    async def _generate(
+        self,
+        prompt: str,
+        model: Optional[str],
+        system: Optional[str],
+        temperature: float,
+        stream: bool,
+        **kwargs,
+    ) -> str:
+        """Send a single /api/generate request"""
         try:
             if not self.client:
                 await self.connect()
@@ -245,7 +291,7 @@ def get_ollama_client(settings: Optional[Settings] = None) -> OllamaClient:
 
     if _ollama_client is None:
         if settings is None:
-            settings = Settings()
+            settings = get_settings()
         _ollama_client = OllamaClient(settings)
 
     return _ollama_client
@@ -8,6 +8,9 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Table name after FROM/JOIN, matched in the query's original case
+_TABLE_REF_RE = re.compile(r'(?:FROM|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)', re.IGNORECASE)
+
 
 class VerificationIssue(Enum):
     """Types of issues detected in query results"""
@@ -21,7 +24,7 @@ class VerificationIssue(Enum):
     NO_ISSUE = "no_issue"
 
 
-@dataclass
+@dataclass(slots=True)
 class VerificationResult:
     """Result of verification check"""
     is_suspicious: bool
@@ -32,7 +35,7 @@ class VerificationResult:
     diagnostic_queries: Optional[List[str]] = None  # Queries to run for diagnosis
 
 
-@dataclass
+@dataclass(slots=True)
 class DiagnosticResult:
     """Result from running diagnostic queries"""
     table_exists: bool
@@ -93,6 +96,18 @@ class ResultVerificationAgent:
         Returns:
             VerificationResult with details about any issues found
         """
+        # Every check is an in-memory heuristic; nothing here needs to await
+        return self._verify_sync(question, sql, result, schema, database_type)
+
+    def _verify_sync(
+        self,
+        question: str,
+        sql: str,
+        result: Dict[str, Any],
+        schema: str,
+        database_type: str = "postgresql"
+    ) -> VerificationResult:
+        """Run the verification heuristics (see verify_results)"""
         # If query failed, no need to verify
         if not result.get("success", False):
             return VerificationResult(
@@ -108,11 +123,11 @@ class ResultVerificationAgent:
 
         # Check 1: Empty results
         if row_count == 0:
-            return await self._check_empty_result(question, sql, schema, database_type)
+            return self._check_empty_result(question, sql, schema, database_type)
 
         # Check 2: All NULL values
         if self._has_all_nulls(data):
-            return await self._check_all_nulls(question, sql, data, schema, database_type)
+            return self._check_all_nulls(question, sql, data, schema, database_type)
 
         # Check 3: Extreme values
         extreme_check = self._check_extreme_values(data, columns)
@@ -138,7 +153,7 @@ class ResultVerificationAgent:
             description="Results look valid"
         )
 
-    async def _check_empty_result(
+    def _check_empty_result(
         self,
         question: str,
         sql: str,
@@ -177,7 +192,7 @@ class ResultVerificationAgent:
             diagnostic_queries=diagnostic_queries
         )
 
-    async def _check_all_nulls(
+    def _check_all_nulls(
         self,
         question: str,
         sql: str,
@@ -222,25 +237,21 @@ class ResultVerificationAgent:
         Returns:
             VerificationResult
         """
-        extreme_values = []
+        threshold = self.extreme_value_threshold
 
+        # Only the first extreme value is reported, so stop scanning there
         for row in data:
-            for col, val in row.items():
+            for col_name, val in row.items():
                 # Check numeric values
-                if isinstance(val, (int, float)):
-                    if abs(val) > self.extreme_value_threshold:
-                        extreme_values.append((col, val))
-
-        if extreme_values:
-            col_name, val = extreme_values[0]
-            return VerificationResult(
-                is_suspicious=True,
-                confidence=0.6,  # Medium confidence - could be legitimate
-                issue_type=VerificationIssue.EXTREME_VALUE,
-                description=f"Found extreme value: {val} in column '{col_name}'. This might indicate wrong aggregation or calculation.",
-                suggested_fix="Check aggregation functions (SUM, COUNT), verify JOIN multipliers, or check data types",
-                diagnostic_queries=None
-            )
+                if isinstance(val, (int, float)) and abs(val) > threshold:
+                    return VerificationResult(
+                        is_suspicious=True,
+                        confidence=0.6,  # Medium confidence - could be legitimate
+                        issue_type=VerificationIssue.EXTREME_VALUE,
+                        description=f"Found extreme value: {val} in column '{col_name}'. This might indicate wrong aggregation or calculation.",
+                        suggested_fix="Check aggregation functions (SUM, COUNT), verify JOIN multipliers, or check data types",
+                        diagnostic_queries=None
+                    )
 
         return VerificationResult(
             is_suspicious=False,
@@ -350,15 +361,8 @@ class ResultVerificationAgent:
         Returns:
             True if all values are NULL
         """
-        if not data:
-            return False
-
-        for row in data:
-            for val in row.values():
-                if val is not None:
-                    return False
-
-        return True
+        # all() stops at the first non-NULL value
+        return bool(data) and all(val is None for row in data for val in row.values())
 
     def _extract_table_names(self, sql: str) -> List[str]:
         """
@@ -370,22 +374,8 @@ class ResultVerificationAgent:
         Returns:
             List of table names
         """
-        tables = []
-        sql_upper = sql.upper()
-
-        # Simple regex to find table names after FROM and JOIN
-        # Pattern: FROM/JOIN <table_name>
-        pattern = r'(?:FROM|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-        matches = re.findall(pattern, sql_upper)
-
-        # Also check original case for actual names
-        pattern_case = r'(?:FROM|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-        matches_case = re.findall(pattern_case, sql, re.IGNORECASE)
-
-        tables.extend(matches_case)
-
-        # Remove duplicates and return
-        return list(set(tables))
+        # Remove duplicates, keeping the order tables appear in the query
+        return list(dict.fromkeys(_TABLE_REF_RE.findall(sql)))
 
     async def run_diagnostics(
         self,
@@ -436,7 +426,7 @@ class ResultVerificationAgent:
                         logger.info(f"Diagnostic query succeeded: {query[:100]}")
 
                         # Parse results
-                        if 'COUNT(*)' in query.upper() or 'COUNT(' in query.upper():
+                        if 'COUNT(' in query.upper():
                             # This is a count query
                             if result["data"] and len(result["data"]) > 0:
                                 count = list(result["data"][0].values())[0]
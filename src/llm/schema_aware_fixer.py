@@ -1,16 +1,65 @@
 """Schema-Aware SQL Fixer - Fast corrections using schema metadata"""
 import logging
 import re
-from typing import Optional, Dict, List, Tuple, Any
+from functools import lru_cache
+from typing import Optional, Dict, List, Mapping, Tuple, Any, Union
 from difflib import SequenceMatcher
 from dataclasses import dataclass
 
+from cachetools import LRUCache
+
 from src.llm.self_correcting_agent import ErrorType
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# RapidFuzz's ratio is a normalized Indel (LCS-based) similarity, while difflib's
+# SequenceMatcher uses Ratcliff/Obershelp. They agree on typical identifier
+# typos but can score other pairs differently, so the expected quick fixes are
+# pinned under both backends in tests/test_schema_aware_fixer.py.
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
+_IDENTIFIER = r'([a-zA-Z_][a-zA-Z0-9_]*)'
+
+# Tried in order; the first pattern that matches wins
+_TABLE_NAME_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'table["\s]+' + _IDENTIFIER,
+    r'relation["\s]+' + _IDENTIFIER,
+    r'no such table:\s*' + _IDENTIFIER,
+    r'"' + _IDENTIFIER + r'".*does not exist',
+))
+_COLUMN_NAME_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'column["\s]+' + _IDENTIFIER,
+    r'field["\s]+' + _IDENTIFIER,
+    r'no such column:\s*' + _IDENTIFIER,
+    r'"' + _IDENTIFIER + r'".*does not exist',
+))
+
+_FROM_TABLE_RE = re.compile(r'FROM\s+' + _IDENTIFIER, re.IGNORECASE)
+_JOIN_TABLE_RE = re.compile(r'JOIN\s+' + _IDENTIFIER, re.IGNORECASE)
+
+# Simple syntax fixes: (pattern, replacement, description)
+_SYNTAX_FIXES = (
+    # Missing semicolon (if database requires it)
+    (re.compile(r'^(.*[^;])\s*$'), r'\1;', "Added missing semicolon"),
+
+    # Double spaces
+    (re.compile(r'\s{2,}'), ' ', "Removed extra spaces"),
+
+    # Missing space after comma
+    (re.compile(r',(\S)'), r', \1', "Added space after comma"),
+)
+
+
+@lru_cache(maxsize=256)
+def _word_re(word: str) -> re.Pattern:
+    """Case-insensitive whole-word pattern for an identifier"""
+    return re.compile(r'\b' + re.escape(word) + r'\b', re.IGNORECASE)
+
+
+@dataclass(slots=True)
 class QuickFix:
     """Result of a quick fix attempt"""
     success: bool
@@ -30,14 +79,17 @@ class FuzzyMatcher:
         """
         Calculate similarity between two strings (0.0 to 1.0)
 
-        Uses SequenceMatcher for accurate similarity scoring
+        Uses RapidFuzz's Indel ratio when installed, otherwise
+        SequenceMatcher's Ratcliff/Obershelp ratio
         """
+        if fuzz is not None:
+            return fuzz.ratio(a.lower(), b.lower()) / 100.0
         return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
     @staticmethod
     def find_closest(
         target: str,
-        candidates: List[str],
+        candidates: Union[List[str], Mapping[str, str]],
         threshold: float = 0.6,
         max_results: int = 3
     ) -> List[Tuple[str, float]]:
@@ -46,7 +98,8 @@ class FuzzyMatcher:
 
         Args:
             target: String to match
-            candidates: List of candidate strings
+            candidates: List of candidate strings, or a mapping of candidate
+                to its lowercased form to skip lowercasing on every call
             threshold: Minimum similarity score (0-1)
             max_results: Maximum number of results to return
 
@@ -56,18 +109,47 @@ class FuzzyMatcher:
         if not target or not candidates:
             return []
 
-        # Calculate similarity for all candidates
-        similarities = [
-            (candidate, FuzzyMatcher.similarity(target, candidate))
-            for candidate in candidates
-        ]
+        if process is not None:
+            # Scores, filters and keeps the top results in one C pass
+            if isinstance(candidates, Mapping):
+                matches = process.extract(
+                    target.lower(),
+                    candidates,
+                    scorer=fuzz.ratio,
+                    processor=None,
+                    limit=max_results,
+                    score_cutoff=round(threshold * 100, 6),
+                )
+                return [(candidate, score / 100.0) for _, score, candidate in matches]
+
+            matches = process.extract(
+                target,
+                candidates,
+                scorer=fuzz.ratio,
+                processor=str.lower,
+                limit=max_results,
+                score_cutoff=round(threshold * 100, 6),
+            )
+            return [(candidate, score / 100.0) for candidate, score, _ in matches]
 
-        # Filter by threshold and sort by similarity
-        matches = [
-            (candidate, score)
-            for candidate, score in similarities
-            if score >= threshold
-        ]
+        if isinstance(candidates, Mapping):
+            lowered = candidates.items()
+        else:
+            lowered = ((candidate, candidate.lower()) for candidate in candidates)
+
+        # Score candidates, skipping full ratio() when a cheap upper bound
+        # (length, then character multiset) already rules them out
+        matcher = SequenceMatcher(None, target.lower())
+        matches = []
+        for candidate, candidate_lower in lowered:
+            matcher.set_seq2(candidate_lower)
+            if (
+                matcher.real_quick_ratio() >= threshold
+                and matcher.quick_ratio() >= threshold
+            ):
+                score = matcher.ratio()
+                if score >= threshold:
+                    matches.append((candidate, score))
 
         # Sort by similarity (descending) and return top results
         matches.sort(key=lambda x: x[1], reverse=True)
@@ -76,7 +158,7 @@ class FuzzyMatcher:
     @staticmethod
     def find_best_match(
         target: str,
-        candidates: List[str],
+        candidates: Union[List[str], Mapping[str, str]],
         threshold: float = 0.6
     ) -> Optional[Tuple[str, float]]:
         """
@@ -85,6 +167,27 @@ class FuzzyMatcher:
         Returns:
             (best_candidate, similarity_score) or None
         """
+        if process is not None and target and candidates:
+            # extractOne keeps only the running best instead of a top-k list
+            if isinstance(candidates, Mapping):
+                match = process.extractOne(
+                    target.lower(),
+                    candidates,
+                    scorer=fuzz.ratio,
+                    processor=None,
+                    score_cutoff=round(threshold * 100, 6),
+                )
+                return (match[2], match[1] / 100.0) if match else None
+
+            match = process.extractOne(
+                target,
+                candidates,
+                scorer=fuzz.ratio,
+                processor=str.lower,
+                score_cutoff=round(threshold * 100, 6),
+            )
+            return (match[0], match[1] / 100.0) if match else None
+
         matches = FuzzyMatcher.find_closest(target, candidates, threshold, max_results=1)
         return matches[0] if matches else None
 
@@ -128,17 +231,31 @@ class SchemaAwareFixer:
         """Build fast lookup caches for common corrections"""
         # Extract all table names
         self.table_names = list(self.schema.get("tables", {}).keys())
+        self._table_name_set = frozenset(self.table_names)
 
         # Extract all column names by table
         self.columns_by_table: Dict[str, List[str]] = {}
         for table_name, table_info in self.schema.get("tables", {}).items():
             self.columns_by_table[table_name] = table_info.get("columns", [])
 
-        # Build global column list (for when table is unknown)
-        self.all_columns = []
-        for columns in self.columns_by_table.values():
-            self.all_columns.extend(columns)
-        self.all_columns = list(set(self.all_columns))  # Remove duplicates
+        # Build global column list (for when table is unknown), deduplicated
+        # in schema order so equal-scoring fuzzy matches resolve consistently
+        self.all_columns = list(dict.fromkeys(
+            column
+            for columns in self.columns_by_table.values()
+            for column in columns
+        ))
+
+        # Schema names are fixed, so lowercase them once for fuzzy matching
+        self._table_choices = {name: name.lower() for name in self.table_names}
+        self._column_choices_by_table = {
+            table_name: {column: column.lower() for column in columns}
+            for table_name, columns in self.columns_by_table.items()
+        }
+        self._all_column_choices = {column: column.lower() for column in self.all_columns}
+
+        # Fixers are reused across queries, so remember which table each SQL targets
+        self._table_for_sql: LRUCache = LRUCache(maxsize=256)
 
         logger.info(
             f"Schema cache built: {len(self.table_names)} tables, "
@@ -205,7 +322,7 @@ class SchemaAwareFixer:
         # Find best match in schema
         match = self.fuzzy_matcher.find_best_match(
             missing_table,
-            self.table_names,
+            self._table_choices,
             threshold=0.6
         )
 
@@ -219,15 +336,13 @@ class SchemaAwareFixer:
             f"(confidence: {confidence:.2f})"
         )
 
-        # Only use if confidence is high enough
-        if confidence < 0.7:
-            return QuickFix(success=False, confidence=confidence)
-
         # Replace table name in SQL
         fixed_sql = self._replace_table_name(sql, missing_table, correct_table)
 
         return QuickFix(
-            success=True,
+            # Only use if confidence is high enough; lower-confidence
+            # candidates are still returned for speculative execution
+            success=confidence >= 0.7,
             fixed_sql=fixed_sql,
             correction_type="table_name",
             original_value=missing_table,
@@ -258,10 +373,10 @@ class SchemaAwareFixer:
 
         # Get candidate columns
         if table_name and table_name in self.columns_by_table:
-            candidates = self.columns_by_table[table_name]
+            candidates = self._column_choices_by_table[table_name]
             logger.info(f"Searching in table {table_name} columns")
         else:
-            candidates = self.all_columns
+            candidates = self._all_column_choices
             logger.info("Searching in all columns (table unknown)")
 
         # Find best match
@@ -281,15 +396,13 @@ class SchemaAwareFixer:
             f"(confidence: {confidence:.2f})"
         )
 
-        # Only use if confidence is high enough
-        if confidence < 0.7:
-            return QuickFix(success=False, confidence=confidence)
-
         # Replace column name in SQL
         fixed_sql = self._replace_column_name(sql, missing_column, correct_column)
 
         return QuickFix(
-            success=True,
+            # Only use if confidence is high enough; lower-confidence
+            # candidates are still returned for speculative execution
+            success=confidence >= 0.7,
             fixed_sql=fixed_sql,
             correction_type="column_name",
             original_value=missing_column,
@@ -309,21 +422,9 @@ class SchemaAwareFixer:
 
         Note: Most syntax errors need LLM. We only handle very simple cases.
         """
-        # Common simple syntax fixes
-        fixes = [
-            # Missing semicolon (if database requires it)
-            (r'^(.*[^;])\s*$', r'\1;', "Added missing semicolon"),
-
-            # Double spaces
-            (r'\s{2,}', ' ', "Removed extra spaces"),
-
-            # Missing space after comma
-            (r',(\S)', r', \1', "Added space after comma"),
-        ]
-
-        for pattern, replacement, description in fixes:
-            if re.search(pattern, sql):
-                fixed_sql = re.sub(pattern, replacement, sql)
+        for pattern, replacement, description in _SYNTAX_FIXES:
+            if pattern.search(sql):
+                fixed_sql = pattern.sub(replacement, sql)
                 if fixed_sql != sql:
                     return QuickFix(
                         success=True,
@@ -337,15 +438,8 @@ class SchemaAwareFixer:
 
     def _extract_table_name(self, error_message: str) -> Optional[str]:
         """Extract table name from error message"""
-        patterns = [
-            r'table["\s]+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'relation["\s]+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'no such table:\s*([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'"([a-zA-Z_][a-zA-Z0-9_]*)".*does not exist',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, error_message, re.IGNORECASE)
+        for pattern in _TABLE_NAME_PATTERNS:
+            match = pattern.search(error_message)
             if match:
                 return match.group(1)
 
@@ -353,15 +447,8 @@ class SchemaAwareFixer:
 
     def _extract_column_name(self, error_message: str) -> Optional[str]:
         """Extract column name from error message"""
-        patterns = [
-            r'column["\s]+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'field["\s]+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'no such column:\s*([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'"([a-zA-Z_][a-zA-Z0-9_]*)".*does not exist',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, error_message, re.IGNORECASE)
+        for pattern in _COLUMN_NAME_PATTERNS:
+            match = pattern.search(error_message)
             if match:
                 return match.group(1)
 
@@ -369,19 +456,30 @@ class SchemaAwareFixer:
 
     def _identify_table_from_sql(self, sql: str) -> Optional[str]:
         """Try to identify which table is being queried"""
+        try:
+            return self._table_for_sql[sql]
+        except KeyError:
+            pass
+
+        table_name = self._scan_table_from_sql(sql)
+        self._table_for_sql[sql] = table_name
+        return table_name
+
+    def _scan_table_from_sql(self, sql: str) -> Optional[str]:
+        """Find the first FROM/JOIN table that exists in the schema"""
         # Look for FROM clause
-        from_match = re.search(r'FROM\s+([a-zA-Z_][a-zA-Z0-9_]*)', sql, re.IGNORECASE)
+        from_match = _FROM_TABLE_RE.search(sql)
         if from_match:
             table_name = from_match.group(1)
             # Check if it's in our schema
-            if table_name in self.table_names:
+            if table_name in self._table_name_set:
                 return table_name
 
         # Look for JOIN clauses
-        join_match = re.search(r'JOIN\s+([a-zA-Z_][a-zA-Z0-9_]*)', sql, re.IGNORECASE)
+        join_match = _JOIN_TABLE_RE.search(sql)
         if join_match:
             table_name = join_match.group(1)
-            if table_name in self.table_names:
+            if table_name in self._table_name_set:
                 return table_name
 
         return None
@@ -389,16 +487,12 @@ class SchemaAwareFixer:
     def _replace_table_name(self, sql: str, old_name: str, new_name: str) -> str:
         """Replace table name in SQL, being careful about word boundaries"""
         # Use word boundaries to avoid partial matches
-        pattern = r'\b' + re.escape(old_name) + r'\b'
-        fixed_sql = re.sub(pattern, new_name, sql, flags=re.IGNORECASE)
-        return fixed_sql
+        return _word_re(old_name).sub(new_name, sql)
 
     def _replace_column_name(self, sql: str, old_name: str, new_name: str) -> str:
         """Replace column name in SQL"""
         # Use word boundaries to avoid partial matches
-        pattern = r'\b' + re.escape(old_name) + r'\b'
-        fixed_sql = re.sub(pattern, new_name, sql, flags=re.IGNORECASE)
-        return fixed_sql
+        return _word_re(old_name).sub(new_name, sql)
 
     def get_correction_stats(self) -> Dict[str, Any]:
         """Get statistics about available corrections"""
@@ -1,15 +1,71 @@
 """Self-Correcting SQL Agent with automatic error recovery"""
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+import re
+import sys
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
-from src.llm.sql_generator import SQLGenerator
+from src.llm.sql_generator import SQLGenerator, SQLValidator
 from src.core.executor import SQLExecutor
 from src.database.models import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# Schema JSON can be large, so parse it with orjson when available
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# String and numeric literals, masked out when building SQL skeletons
+_SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SKELETON_PLACEHOLDER = "\x00"
+
+
+@lru_cache(maxsize=1024)
+def _sql_skeleton(sql: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Split SQL into a whitespace-normalized skeleton and its literals
+
+    Queries that differ only in literal values share a skeleton, so a fix
+    learned for one can be replayed on the others.
+
+    Returns:
+        (skeleton with literals replaced by a placeholder, literals in order)
+    """
+    literals = tuple(match.group(0) for match in _SQL_LITERAL_RE.finditer(sql))
+    skeleton = " ".join(_SQL_LITERAL_RE.sub(_SKELETON_PLACEHOLDER, sql).split())
+    return skeleton, literals
+
+
+def _schema_digest(schema: Any) -> str:
+    """Digest identifying a schema, so remembered fixes never cross databases"""
+    if not isinstance(schema, str):
+        schema = json.dumps(schema, sort_keys=True, default=str)
+    return hashlib.sha1(schema.encode()).hexdigest()
+
+# Parsed schema-aware fixers shared by all agents, keyed by schema. Agents are
+# usually created per request, so a process-wide cache lets concurrent requests
+# against the same database build the fixer once.
+_fixer_cache: "OrderedDict[str, Any]" = OrderedDict()
+
+# Successful fixes shared by all agents, keyed by (error_type, failed SQL
+# skeleton, database_type, schema digest) and replayed directly when the same
+# error recurs on the same query shape against the same schema
+_fix_memory: "OrderedDict[Tuple[ErrorType, str, str, str], str]" = OrderedDict()
+
+# Schema-aware fixer for the query currently being corrected. Scoped to the
+# calling task so concurrent calls on a shared agent don't see each other's fixer.
+_schema_fixer_cv: ContextVar[Any] = ContextVar("schema_fixer", default=None)
+
 # Import CorrectionLearner (optional to avoid circular imports)
 try:
     from src.llm.correction_learner import CorrectionLearner
@@ -30,7 +86,25 @@ class ErrorType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+# ErrorType -> value string, avoiding the Enum.value descriptor in hot paths
+ERROR_TYPE_VALUES: Dict[ErrorType, str] = {
+    error_type: sys.intern(error_type.value) for error_type in ErrorType
+}
+_UNKNOWN_VALUE = ERROR_TYPE_VALUES[ErrorType.UNKNOWN]
+
+
+# Maximum characters of SQL/error text shown in reports and logs
+PREVIEW_LENGTH = 200
+
+
+def _preview(text: Optional[str]) -> Optional[str]:
+    """Truncate text to PREVIEW_LENGTH characters, marking truncation with '...'"""
+    if text is None or len(text) <= PREVIEW_LENGTH:
+        return text
+    return text[:PREVIEW_LENGTH] + "..."
+
+
+@dataclass(slots=True)
 class CorrectionAttempt:
     """Record of a correction attempt"""
     attempt_number: int
@@ -40,11 +114,119 @@ class CorrectionAttempt:
     success: bool
     execution_time_ms: Optional[float]
     row_count: Optional[int]
+    _sql_preview: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def sql_preview(self) -> str:
+        """SQL truncated for reports (computed once, sql is never reassigned)"""
+        if self._sql_preview is None:
+            self._sql_preview = _preview(self.sql)
+        return self._sql_preview
+
+    @property
+    def error_preview(self) -> Optional[str]:
+        """Error truncated for reports (not cached, error may be updated after verification)"""
+        return self.error[:PREVIEW_LENGTH] if self.error else None
+
+
+# Error keywords by type, in order of specificity (most specific first):
+# type mismatch before "does not exist", column before table
+_ERROR_KEYWORDS = (
+    (ErrorType.TYPE_MISMATCH, (
+        "operator does not exist", "type mismatch", "cast", "conversion", "incompatible"
+    )),
+    (ErrorType.COLUMN_NOT_FOUND, (
+        "column", "field", "unknown column", "no such column"
+    )),
+    (ErrorType.TABLE_NOT_FOUND, (
+        "table", "relation", "no such table", "does not exist"
+    )),
+    (ErrorType.SYNTAX_ERROR, (
+        "syntax error", "syntax", "parse error", "unexpected"
+    )),
+    (ErrorType.PERMISSION_DENIED, (
+        "permission", "denied", "access", "unauthorized"
+    )),
+    (ErrorType.TIMEOUT, (
+        "timeout", "timed out", "exceeded"
+    )),
+)
+
+# Error types the schema-aware fixer can correct from schema metadata alone
+_SCHEMA_FIXABLE = frozenset({ErrorType.TABLE_NOT_FOUND, ErrorType.COLUMN_NOT_FOUND})
+
+# Patterns for pulling the missing object name out of a lowercased error,
+# covering PostgreSQL (relation "x"), SQLite (no such table: x) and MySQL ('x');
+# a schema/database qualifier in front of the table name is skipped
+_MISSING_TABLE_RE = re.compile(
+    r'(?:table|relation)["\'\s:]+(?:[a-z_][a-z0-9_]*\.)?([a-z_][a-z0-9_]*)'
+)
+_MISSING_COLUMN_RE = re.compile(r'column["\'\s:]+([a-z_][a-z0-9_]*)')
+
+# Static fix hints per error type, pre-joined
+_STATIC_HINTS: Dict[ErrorType, str] = {
+    ErrorType.TABLE_NOT_FOUND: (
+        "Check the schema for the correct table name.\n"
+        "Table names may be case-sensitive."
+    ),
+    ErrorType.COLUMN_NOT_FOUND: (
+        "Check the schema for the correct column name.\n"
+        "Make sure you're referencing the right table."
+    ),
+    ErrorType.SYNTAX_ERROR: (
+        "Check for missing commas, parentheses, or keywords.\n"
+        "Verify SQL syntax is correct for the database type."
+    ),
+    ErrorType.TYPE_MISMATCH: (
+        "Check data types in comparisons and operations.\n"
+        "You may need to cast values to the correct type."
+    ),
+}
+
+# Error type -> (context key, static hint plus the prefix naming the missing object)
+_MISSING_NAME_HINTS: Dict[ErrorType, tuple] = {
+    ErrorType.TABLE_NOT_FOUND: (
+        "missing_table",
+        _STATIC_HINTS[ErrorType.TABLE_NOT_FOUND] + "\nCould not find table: "
+    ),
+    ErrorType.COLUMN_NOT_FOUND: (
+        "missing_column",
+        _STATIC_HINTS[ErrorType.COLUMN_NOT_FOUND] + "\nCould not find column: "
+    ),
+}
+
+
+@dataclass(slots=True)
+class Diagnosis:
+    """Categorized error with extracted context and fix hints"""
+    error_type: ErrorType
+    context: Dict[str, Any]
+    hints: str
 
 
 class ErrorDiagnostics:
     """Analyze and categorize SQL errors"""
 
+    @staticmethod
+    def diagnose(error_message: str) -> Diagnosis:
+        """
+        Categorize an error, extract its context and generate fix hints in one pass
+
+        Args:
+            error_message: Error message from database
+
+        Returns:
+            Diagnosis with error type, context and hints
+        """
+        error_lower = error_message.lower()
+        error_type = ErrorDiagnostics._categorize_lower(error_lower)
+        context = ErrorDiagnostics._extract_context_lower(error_message, error_lower, error_type)
+        return Diagnosis(
+            error_type=error_type,
+            context=context,
+            hints=ErrorDiagnostics.generate_fix_hints(error_type, context)
+        )
+
     @staticmethod
     def categorize_error(error_message: str) -> ErrorType:
         """
@@ -56,45 +238,14 @@ class ErrorDiagnostics:
         Returns:
             ErrorType enum
         """
-        error_lower = error_message.lower()
+        return ErrorDiagnostics._categorize_lower(error_message.lower())
 
-        # Check in order of specificity (most specific first)
-
-        # Type mismatch (check before "does not exist" matches)
-        if any(keyword in error_lower for keyword in [
-            "operator does not exist", "type mismatch", "cast", "conversion", "incompatible"
-        ]):
-            return ErrorType.TYPE_MISMATCH
-
-        # Column not found (check before table since column errors are more specific)
-        if any(keyword in error_lower for keyword in [
-            "column", "field", "unknown column", "no such column"
-        ]):
-            return ErrorType.COLUMN_NOT_FOUND
-
-        # Table not found
-        if any(keyword in error_lower for keyword in [
-            "table", "relation", "no such table", "does not exist"
-        ]):
-            return ErrorType.TABLE_NOT_FOUND
-
-        # Syntax errors
-        if any(keyword in error_lower for keyword in [
-            "syntax error", "syntax", "parse error", "unexpected"
-        ]):
-            return ErrorType.SYNTAX_ERROR
-
-        # Permission issues
-        if any(keyword in error_lower for keyword in [
-            "permission", "denied", "access", "unauthorized"
-        ]):
-            return ErrorType.PERMISSION_DENIED
-
-        # Timeout
-        if any(keyword in error_lower for keyword in [
-            "timeout", "timed out", "exceeded"
-        ]):
-            return ErrorType.TIMEOUT
+    @staticmethod
+    def _categorize_lower(error_lower: str) -> ErrorType:
+        """Categorize an already-lowercased error message"""
+        for error_type, keywords in _ERROR_KEYWORDS:
+            if any(keyword in error_lower for keyword in keywords):
+                return error_type
 
         return ErrorType.UNKNOWN
 
@@ -110,28 +261,41 @@ class ErrorDiagnostics:
         Returns:
             Dictionary with extracted context
         """
+        return ErrorDiagnostics._extract_context_lower(
+            error_message, error_message.lower(), error_type
+        )
+
+    @staticmethod
+    def _extract_context_lower(
+        error_message: str,
+        error_lower: str,
+        error_type: ErrorType
+    ) -> Dict[str, Any]:
+        """Extract context given the raw and lowercased error message"""
         context = {
-            "error_type": error_type.value,
+            "error_type": ERROR_TYPE_VALUES[error_type],
             "raw_error": error_message
         }
 
-        error_lower = error_message.lower()
+        extractor = _CONTEXT_EXTRACTORS.get(error_type)
+        if extractor:
+            extractor(error_lower, context)
 
-        if error_type == ErrorType.TABLE_NOT_FOUND:
-            # Try to extract table name
-            import re
-            match = re.search(r'table["\s]+([a-z_][a-z0-9_]*)', error_lower)
-            if match:
-                context["missing_table"] = match.group(1)
+        return context
 
-        elif error_type == ErrorType.COLUMN_NOT_FOUND:
-            # Try to extract column name
-            import re
-            match = re.search(r'column["\s]+([a-z_][a-z0-9_]*)', error_lower)
-            if match:
-                context["missing_column"] = match.group(1)
+    @staticmethod
+    def _extract_table(error_lower: str, context: Dict[str, Any]) -> None:
+        """Try to extract the missing table name into context"""
+        match = _MISSING_TABLE_RE.search(error_lower)
+        if match:
+            context["missing_table"] = match.group(1)
 
-        return context
+    @staticmethod
+    def _extract_column(error_lower: str, context: Dict[str, Any]) -> None:
+        """Try to extract the missing column name into context"""
+        match = _MISSING_COLUMN_RE.search(error_lower)
+        if match:
+            context["missing_column"] = match.group(1)
 
     @staticmethod
     def generate_fix_hints(error_type: ErrorType, context: Dict[str, Any]) -> str:
@@ -145,29 +309,19 @@ class ErrorDiagnostics:
         Returns:
             Hints for fixing the error
         """
-        hints = []
-
-        if error_type == ErrorType.TABLE_NOT_FOUND:
-            hints.append("Check the schema for the correct table name.")
-            hints.append("Table names may be case-sensitive.")
-            if "missing_table" in context:
-                hints.append(f"Could not find table: {context['missing_table']}")
-
-        elif error_type == ErrorType.COLUMN_NOT_FOUND:
-            hints.append("Check the schema for the correct column name.")
-            hints.append("Make sure you're referencing the right table.")
-            if "missing_column" in context:
-                hints.append(f"Could not find column: {context['missing_column']}")
+        # Name the missing object when context has it
+        missing = _MISSING_NAME_HINTS.get(error_type)
+        if missing and missing[0] in context:
+            return missing[1] + str(context[missing[0]])
 
-        elif error_type == ErrorType.SYNTAX_ERROR:
-            hints.append("Check for missing commas, parentheses, or keywords.")
-            hints.append("Verify SQL syntax is correct for the database type.")
+        return _STATIC_HINTS.get(error_type, "")
 
-        elif error_type == ErrorType.TYPE_MISMATCH:
-            hints.append("Check data types in comparisons and operations.")
-            hints.append("You may need to cast values to the correct type.")
 
-        return "\n".join(hints)
+# Error type -> context extractor, dispatched from _extract_context_lower
+_CONTEXT_EXTRACTORS = {
+    ErrorType.TABLE_NOT_FOUND: ErrorDiagnostics._extract_table,
+    ErrorType.COLUMN_NOT_FOUND: ErrorDiagnostics._extract_column,
+}
 
 
 class SelfCorrectingSQLAgent:
@@ -182,6 +336,22 @@ class SelfCorrectingSQLAgent:
     5. Repeat up to max_retries times
     """
 
+    # Maximum number of schemas to keep parsed schema-aware fixers for
+    FIXER_CACHE_SIZE = 8
+
+    # Maximum number of pending learner writes before new ones are dropped
+    LEARN_QUEUE_SIZE = 1024
+
+    # Maximum number of remembered (failed skeleton -> corrected skeleton) fixes
+    FIX_MEMORY_SIZE = 1024
+
+    # Quick fixes at or above this confidence are applied directly
+    QUICK_FIX_CONFIDENCE = 0.7
+
+    # Borderline quick fixes at or above this confidence are executed
+    # speculatively while the LLM generates its own fix
+    SPECULATIVE_FIX_CONFIDENCE = 0.5
+
     def __init__(
         self,
         sql_generator: SQLGenerator,
@@ -190,6 +360,7 @@ class SelfCorrectingSQLAgent:
         enable_learning: bool = True,
         enable_schema_fixes: bool = True,
         enable_result_verification: bool = True,
+        enable_speculative_fix: bool = True,
         learner_session = None
     ):
         """
@@ -202,6 +373,8 @@ class SelfCorrectingSQLAgent:
             enable_learning: Whether to enable learning from corrections
             enable_schema_fixes: Whether to enable fast schema-aware fixes
             enable_result_verification: Whether to enable result verification
+            enable_speculative_fix: Whether to execute borderline quick fixes
+                concurrently with LLM fix generation
             learner_session: Database session for the learner (optional)
         """
         self.generator = sql_generator
@@ -209,8 +382,17 @@ class SelfCorrectingSQLAgent:
         self.enable_diagnostics = enable_diagnostics
         self.enable_schema_fixes = enable_schema_fixes
         self.enable_result_verification = enable_result_verification
+        self.enable_speculative_fix = enable_speculative_fix
         self.diagnostics = ErrorDiagnostics()
 
+        # Executors are stateless per query, so reuse one per allow_write mode
+        self._executors: Dict[bool, SQLExecutor] = {}
+
+        # Learner writes are queued and drained by a background task
+        # (both created on first use, when an event loop is running)
+        self._learn_queue: Optional[asyncio.Queue] = None
+        self._learn_task: Optional[asyncio.Task] = None
+
         # Initialize learner if available and enabled
         self.enable_learning = enable_learning and LEARNING_AVAILABLE
         self.learner = None
@@ -223,8 +405,9 @@ class SelfCorrectingSQLAgent:
         elif enable_learning and not LEARNING_AVAILABLE:
             logger.warning("Learning requested but CorrectionLearner not available")
 
-        # Schema-aware fixer will be initialized per-query with schema
-        self.schema_fixer = None
+        # Schema-aware fixer will be initialized per-query with schema.
+        # Fixers are cached by schema so repeated queries against the same
+        # database skip re-parsing the schema and rebuilding lookup caches.
         if self.enable_schema_fixes:
             logger.info("Schema-aware fixes enabled")
 
@@ -242,6 +425,232 @@ class SelfCorrectingSQLAgent:
                 logger.warning("ResultVerificationAgent not available - verification disabled")
                 self.enable_result_verification = False
 
+    def _get_executor(self, allow_write: bool) -> SQLExecutor:
+        """
+        Get a cached SQL executor for the given write mode
+
+        Args:
+            allow_write: Whether to allow write operations
+
+        Returns:
+            SQLExecutor instance shared across calls
+        """
+        executor = self._executors.get(allow_write)
+        if executor is None:
+            executor = SQLExecutor(
+                max_rows=1000,
+                timeout_seconds=30,
+                allow_write=allow_write
+            )
+            self._executors[allow_write] = executor
+        return executor
+
+    @property
+    def schema_fixer(self):
+        """Schema-aware fixer for the query being corrected in the current task"""
+        return _schema_fixer_cv.get()
+
+    @schema_fixer.setter
+    def schema_fixer(self, fixer) -> None:
+        _schema_fixer_cv.set(fixer)
+
+    def _get_schema_fixer(self, schema: Any):
+        """
+        Get a schema-aware fixer for the schema, reusing cached fixers
+
+        Args:
+            schema: Database schema (JSON string or dict)
+
+        Returns:
+            SchemaAwareFixer instance, or None if the schema can't be used
+        """
+        # Strings are keyed by value; dicts by content, so equal schemas
+        # share a fixer and the cache doesn't hold on to caller-owned dicts
+        key = schema if isinstance(schema, str) else _schema_digest(schema)
+        if key in _fixer_cache:
+            _fixer_cache.move_to_end(key)
+            return _fixer_cache[key]
+
+        # Imported lazily: schema_aware_fixer imports ErrorType from this module
+        from src.llm.schema_aware_fixer import SchemaAwareFixer
+
+        try:
+            # Parse schema if it's a string
+            schema_dict = _json_loads(schema) if isinstance(schema, str) else schema
+            fixer = SchemaAwareFixer(schema_dict)
+            logger.info("Schema-aware fixer initialized with schema")
+        except Exception as e:
+            logger.warning("Failed to initialize schema-aware fixer: %s", e)
+            fixer = None
+
+        # Failures are cached too so unparseable schemas aren't retried per query
+        _fixer_cache[key] = fixer
+        if len(_fixer_cache) > self.FIXER_CACHE_SIZE:
+            _fixer_cache.popitem(last=False)
+        return fixer
+
+    def _recall_fix(
+        self,
+        sql: str,
+        error_type: ErrorType,
+        database_type: str,
+        schema_key: str,
+    ) -> Optional[str]:
+        """
+        Rebuild a previously successful fix for this query shape and error
+
+        Args:
+            sql: SQL that failed
+            error_type: Categorized error type
+            database_type: Type of database
+            schema_key: Digest of the schema the query runs against
+
+        Returns:
+            Corrected SQL with this query's literals, or None if nothing is remembered
+        """
+        skeleton, literals = _sql_skeleton(sql)
+        key = (error_type, skeleton.lower(), database_type, schema_key)
+        template = _fix_memory.get(key)
+        if template is None:
+            return None
+
+        _fix_memory.move_to_end(key)
+        parts = template.split(_SKELETON_PLACEHOLDER)
+        fixed_sql = parts[0]
+        for literal, part in zip(literals, parts[1:]):
+            fixed_sql += literal + part
+        return fixed_sql
+
+    def _remember_fix(
+        self,
+        error_type: ErrorType,
+        failed_sql: str,
+        corrected_sql: str,
+        database_type: str,
+        schema_key: str,
+    ) -> None:
+        """
+        Remember a successful fix so it can be replayed on the same query shape
+
+        Only fixes that leave literals untouched are remembered, since those
+        can be replayed on queries with different literal values.
+        """
+        failed_skeleton, failed_literals = _sql_skeleton(failed_sql)
+        corrected_skeleton, corrected_literals = _sql_skeleton(corrected_sql)
+        if failed_literals != corrected_literals:
+            return
+
+        key = (error_type, failed_skeleton.lower(), database_type, schema_key)
+        _fix_memory[key] = corrected_skeleton
+        _fix_memory.move_to_end(key)
+        if len(_fix_memory) > self.FIX_MEMORY_SIZE:
+            _fix_memory.popitem(last=False)
+
+    def _enqueue_learning(self, payload: Dict[str, Any]) -> None:
+        """
+        Queue a successful correction for the background learner worker
+
+        Args:
+            payload: Keyword arguments for CorrectionLearner.learn_from_correction
+        """
+        if self._learn_queue is None:
+            self._learn_queue = asyncio.Queue(maxsize=self.LEARN_QUEUE_SIZE)
+        if self._learn_task is None or self._learn_task.done():
+            self._learn_task = asyncio.create_task(self._learn_worker())
+
+        try:
+            self._learn_queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning("Learning queue full - dropping correction for %s", payload["error_type"].value)
+
+    async def _learn_worker(self) -> None:
+        """Record queued corrections with the learner"""
+        while True:
+            payload = await self._learn_queue.get()
+            try:
+                await self.learner.learn_from_correction(**payload)
+                logger.info("✨ Learned from successful correction")
+            except Exception as e:
+                logger.error("Failed to record learned correction: %s", e)
+            finally:
+                self._learn_queue.task_done()
+
+    async def aclose(self) -> None:
+        """Wait for queued learner writes to finish and stop the background worker"""
+        if self._learn_task is None:
+            return
+
+        if not self._learn_task.done():
+            await self._learn_queue.join()
+            self._learn_task.cancel()
+        await asyncio.gather(self._learn_task, return_exceptions=True)
+        self._learn_task = None
+
+    async def __aenter__(self) -> "SelfCorrectingSQLAgent":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Agents are per request: finish learner writes while the caller's
+        # session is still open, and don't leave the worker behind
+        await self.aclose()
+
+    async def _generate_llm_fix(
+        self,
+        sql: str,
+        last_error: str,
+        error_type: ErrorType,
+        hints: str,
+        schema: str,
+        database_type: str,
+    ) -> str:
+        """
+        Generate corrected SQL with the LLM, using learned corrections as hints
+
+        Args:
+            sql: SQL that failed
+            last_error: Error message from the failed attempt
+            error_type: Categorized error type
+            hints: Fix hints from diagnostics
+            schema: Database schema information
+            database_type: Type of database
+
+        Returns:
+            Corrected SQL
+        """
+        # Check for learned corrections
+        if self.learner:
+            learned_corrections = await self.learner.find_applicable_corrections(
+                error_type=error_type,
+                error_message=last_error,
+                database_type=database_type,
+                sql=sql,
+                limit=1
+            )
+            if learned_corrections:
+                learned_correction = learned_corrections[0]
+                logger.info(
+                    "Found learned correction %s (confidence: %.2f)",
+                    learned_correction['id'],
+                    learned_correction['confidence_score']
+                )
+                # Add learned correction to hints
+                hints += f"\n\nLearned correction available: {learned_correction['correction_description']}"
+
+        # Add hints to error message for better correction
+        enhanced_error = f"{last_error}\n\nHints:\n{hints}"
+
+        # Generate corrected SQL using LLM
+        fix_result = await self.generator.fix_sql_error(
+            sql=sql,
+            error=enhanced_error,
+            schema=schema,
+            database_type=database_type
+        )
+        fixed_sql = fix_result["sql"]
+
+        logger.info("Generated corrected SQL: %.100s...", fixed_sql)
+        return fixed_sql
+
     async def generate_and_execute_with_retry(
         self,
         question: str,
@@ -272,35 +681,49 @@ class SelfCorrectingSQLAgent:
                 - total_attempts: Total number of attempts
                 - error: Final error message (if failed)
         """
+        # Initialize schema-aware fixer if enabled
+        fixer = self._get_schema_fixer(schema) if self.enable_schema_fixes else None
+        token = _schema_fixer_cv.set(fixer)
+        try:
+            return await self._generate_and_execute_with_retry(
+                question=question,
+                schema=schema,
+                session=session,
+                database_type=database_type,
+                allow_write=allow_write,
+                model=model
+            )
+        finally:
+            _schema_fixer_cv.reset(token)
+
+    async def _generate_and_execute_with_retry(
+        self,
+        question: str,
+        schema: str,
+        session,
+        database_type: str,
+        allow_write: bool,
+        model: Optional[str],
+    ) -> Dict[str, Any]:
+        """Retry loop for generate_and_execute_with_retry (schema fixer already set up)"""
         attempts: List[CorrectionAttempt] = []
         last_error = None
+        # Diagnosis of last_error when it came from execution, so the retry
+        # doesn't re-analyze the same message
+        last_diagnosis: Optional[Diagnosis] = None
         sql = None
+        # Digest of the schema for the fix memory, computed on the first retry
+        schema_key = None
 
-        # Initialize schema-aware fixer if enabled
-        if self.enable_schema_fixes:
-            try:
-                from src.llm.schema_aware_fixer import SchemaAwareFixer
-                import json
-                # Parse schema if it's a string
-                schema_dict = json.loads(schema) if isinstance(schema, str) else schema
-                self.schema_fixer = SchemaAwareFixer(schema_dict)
-                logger.info("Schema-aware fixer initialized with schema")
-            except Exception as e:
-                logger.warning(f"Failed to initialize schema-aware fixer: {e}")
-                self.schema_fixer = None
-
-        executor = SQLExecutor(
-            max_rows=1000,
-            timeout_seconds=30,
-            allow_write=allow_write
-        )
+        executor = self._get_executor(allow_write)
 
         for attempt_num in range(1, self.max_retries + 1):
+            exec_result = None
             try:
                 # Generate or fix SQL
                 if attempt_num == 1:
                     # First attempt: generate from scratch
-                    logger.info(f"Attempt {attempt_num}/{self.max_retries}: Generating SQL for: {question}")
+                    logger.info("Attempt %d/%d: Generating SQL for: %s", attempt_num, self.max_retries, question)
                     gen_result = await self.generator.generate_sql(
                         question=question,
                         schema=schema,
@@ -311,76 +734,121 @@ class SelfCorrectingSQLAgent:
                     sql = gen_result["sql"]
                 else:
                     # Retry: fix the error
-                    logger.info(f"Attempt {attempt_num}/{self.max_retries}: Attempting to fix SQL error")
-
-                    # Categorize error
-                    error_type = self.diagnostics.categorize_error(last_error)
-                    error_context = self.diagnostics.extract_error_context(last_error, error_type)
-                    hints = self.diagnostics.generate_fix_hints(error_type, error_context)
-
-                    # Try schema-aware quick fix FIRST (fastest, no LLM call)
-                    quick_fix_used = False
-                    if self.enable_schema_fixes and self.schema_fixer:
-                        from src.llm.schema_aware_fixer import QuickFix
-                        quick_fix = self.schema_fixer.quick_fix(
+                    logger.info("Attempt %d/%d: Attempting to fix SQL error", attempt_num, self.max_retries)
+
+                    # Diagnose error (reuse the diagnosis made at execution time)
+                    diagnosis = last_diagnosis or self.diagnostics.diagnose(last_error)
+                    error_type = diagnosis.error_type
+                    error_context = diagnosis.context
+                    hints = diagnosis.hints
+
+                    # Replay a remembered fix for this query shape FIRST (no analysis needed)
+                    if schema_key is None:
+                        schema_key = _schema_digest(schema)
+                    recalled_sql = self._recall_fix(sql, error_type, database_type, schema_key)
+
+                    # Then try schema-aware quick fix (fast, no LLM call)
+                    quick_fix = None
+                    schema_fixer = self.schema_fixer
+                    if recalled_sql is None and self.enable_schema_fixes and schema_fixer:
+                        if error_type in _SCHEMA_FIXABLE:
+                            quick_fix = schema_fixer.quick_fix(
+                                sql=sql,
+                                error_type=error_type,
+                                error_message=last_error,
+                                context=error_context
+                            )
+                        else:
+                            logger.debug("Skipping schema-aware quick fix for %s", error_type.value)
+
+                    if recalled_sql is not None:
+                        sql = recalled_sql
+                        logger.info("🧠 Replayed remembered fix for %s - SKIPPED LLM CALL", error_type.value)
+
+                    elif quick_fix and quick_fix.success and quick_fix.confidence >= self.QUICK_FIX_CONFIDENCE:
+                        sql = quick_fix.fixed_sql
+                        logger.info(
+                            "⚡ Quick fix applied: %s (confidence: %.2f) - SKIPPED LLM CALL",
+                            quick_fix.explanation,
+                            quick_fix.confidence
+                        )
+                        # Continue to execution without LLM call
+
+                    elif (
+                        self.enable_speculative_fix
+                        and quick_fix
+                        and quick_fix.fixed_sql
+                        and quick_fix.confidence >= self.SPECULATIVE_FIX_CONFIDENCE
+                        # A guessed rewrite must never commit a write
+                        and (not allow_write or SQLValidator.is_read_only(quick_fix.fixed_sql))
+                    ):
+                        # Borderline quick fix: execute it while the LLM works
+                        # on its own fix, and keep it if it succeeds
+                        llm_task = asyncio.create_task(self._generate_llm_fix(
                             sql=sql,
+                            last_error=last_error,
                             error_type=error_type,
-                            error_message=last_error,
-                            context=error_context
-                        )
+                            hints=hints,
+                            schema=schema,
+                            database_type=database_type
+                        ))
+                        try:
+                            speculative_result = await executor.execute_query(
+                                session=session,
+                                sql=quick_fix.fixed_sql
+                            )
+                        except BaseException:
+                            llm_task.cancel()
+                            raise
 
-                        if quick_fix.success and quick_fix.confidence >= 0.7:
+                        if speculative_result["success"]:
+                            llm_task.cancel()
                             sql = quick_fix.fixed_sql
-                            quick_fix_used = True
+                            exec_result = speculative_result
                             logger.info(
-                                f"⚡ Quick fix applied: {quick_fix.explanation} "
-                                f"(confidence: {quick_fix.confidence:.2f}) - SKIPPED LLM CALL"
+                                "⚡ Speculative quick fix succeeded: %s (confidence: %.2f) - CANCELLED LLM CALL",
+                                quick_fix.explanation,
+                                quick_fix.confidence
                             )
-                            # Continue to execution without LLM call
-
-                    if not quick_fix_used:
+                        else:
+                            # Keep the failed guess in the attempt history
+                            attempts.append(CorrectionAttempt(
+                                attempt_number=attempt_num,
+                                sql=quick_fix.fixed_sql,
+                                error=speculative_result["error"],
+                                error_type=self.diagnostics.categorize_error(speculative_result["error"]),
+                                success=False,
+                                execution_time_ms=speculative_result.get("execution_time_ms"),
+                                row_count=speculative_result.get("row_count")
+                            ))
+                            sql = await llm_task
+
+                    else:
                         # Quick fix didn't work, use learned corrections or LLM
-                        # Check for learned corrections
-                        learned_correction = None
-                        if self.learner:
-                            learned_corrections = await self.learner.find_applicable_corrections(
-                                error_type=error_type,
-                                error_message=last_error,
-                                database_type=database_type,
-                                sql=sql,
-                                limit=1
-                            )
-                            if learned_corrections:
-                                learned_correction = learned_corrections[0]
-                                logger.info(
-                                    f"Found learned correction {learned_correction['id']} "
-                                    f"(confidence: {learned_correction['confidence_score']:.2f})"
-                                )
-                                # Add learned correction to hints
-                                hints += f"\n\nLearned correction available: {learned_correction['correction_description']}"
-
-                        # Add hints to error message for better correction
-                        enhanced_error = f"{last_error}\n\nHints:\n{hints}"
-
-                        # Generate corrected SQL using LLM
-                        fix_result = await self.generator.fix_sql_error(
+                        sql = await self._generate_llm_fix(
                             sql=sql,
-                            error=enhanced_error,
+                            last_error=last_error,
+                            error_type=error_type,
+                            hints=hints,
                             schema=schema,
                             database_type=database_type
                         )
-                        sql = fix_result["sql"]
-
-                        logger.info(f"Generated corrected SQL: {sql[:100]}...")
 
                 # Validate SQL before executing
                 if not gen_result.get("is_valid", True) if attempt_num == 1 else True:
-                    logger.warning(f"Generated SQL failed validation: {gen_result.get('warnings')}")
+                    logger.warning("Generated SQL failed validation: %s", gen_result.get('warnings'))
 
-                # Execute SQL
-                exec_result = await executor.execute_query(
-                    session=session,
-                    sql=sql
+                # Execute SQL (unless a speculative quick fix already ran it)
+                if exec_result is None:
+                    exec_result = await executor.execute_query(
+                        session=session,
+                        sql=sql
+                    )
+
+                # Diagnose the execution error once for this attempt
+                last_diagnosis = (
+                    None if exec_result["success"]
+                    else self.diagnostics.diagnose(exec_result["error"])
                 )
 
                 # Record attempt
@@ -388,7 +856,7 @@ class SelfCorrectingSQLAgent:
                     attempt_number=attempt_num,
                     sql=sql,
                     error=None if exec_result["success"] else exec_result["error"],
-                    error_type=ErrorType.UNKNOWN if exec_result["success"] else self.diagnostics.categorize_error(exec_result["error"]),
+                    error_type=last_diagnosis.error_type if last_diagnosis else ErrorType.UNKNOWN,
                     success=exec_result["success"],
                     execution_time_ms=exec_result.get("execution_time_ms"),
                     row_count=exec_result.get("row_count")
@@ -397,7 +865,7 @@ class SelfCorrectingSQLAgent:
 
                 if exec_result["success"]:
                     # Success! But verify results make sense
-                    logger.info(f"✅ Query succeeded on attempt {attempt_num}/{self.max_retries}")
+                    logger.info("✅ Query succeeded on attempt %d/%d", attempt_num, self.max_retries)
 
                     # Verify results if enabled
                     verification_result = None
@@ -415,8 +883,9 @@ class SelfCorrectingSQLAgent:
 
                             if verification_result.is_suspicious:
                                 logger.warning(
-                                    f"⚠️ Suspicious results detected: {verification_result.description} "
-                                    f"(confidence: {verification_result.confidence:.2f})"
+                                    "⚠️ Suspicious results detected: %s (confidence: %.2f)",
+                                    verification_result.description,
+                                    verification_result.confidence
                                 )
 
                                 # Run diagnostics if needed
@@ -428,7 +897,7 @@ class SelfCorrectingSQLAgent:
                                         session=session,
                                         database_type=database_type
                                     )
-                                    logger.info(f"📊 Diagnostics: {diagnostics.diagnosis}")
+                                    logger.info("📊 Diagnostics: %s", diagnostics.diagnosis)
 
                                 # Generate improvement hints
                                 hints = self.verification_agent.generate_improvement_hints(
@@ -453,7 +922,7 @@ class SelfCorrectingSQLAgent:
                                     attempt.error = verification_result.description
 
                                     # Continue to next attempt
-                                    logger.warning(f"❌ Attempt {attempt_num} failed verification check")
+                                    logger.warning("❌ Attempt %d failed verification check", attempt_num)
                                     continue
                                 else:
                                     # Low confidence or last attempt - return with warning
@@ -461,23 +930,39 @@ class SelfCorrectingSQLAgent:
                                         f"⚠️ Result verification: {verification_result.description}"
                                     )
                         except Exception as e:
-                            logger.error(f"Error during result verification: {e}")
+                            logger.error("Error during result verification: %s", e)
                             verification_warnings.append(f"Result verification failed: {str(e)}")
 
+                    # Remember the fix that turned the previous failure into this success
+                    if attempt_num > 1:
+                        # The execution that failed on the previous attempt, not a
+                        # failed speculative run recorded during this one
+                        previous_attempt = next(
+                            a for a in reversed(attempts) if a.attempt_number < attempt_num
+                        )
+                        if previous_attempt.error and previous_attempt.error_type != ErrorType.UNKNOWN:
+                            self._remember_fix(
+                                error_type=previous_attempt.error_type,
+                                failed_sql=previous_attempt.sql,
+                                corrected_sql=sql,
+                                database_type=database_type,
+                                schema_key=schema_key
+                            )
+
                     # Learn from this correction if it was a retry
                     if attempt_num > 1 and self.learner and len(attempts) > 0:
                         # Get the original error from the first failed attempt
                         first_attempt = attempts[0]
                         if not first_attempt.success and first_attempt.error:
-                            await self.learner.learn_from_correction(
-                                error_type=first_attempt.error_type,
-                                original_sql=first_attempt.sql,
-                                original_error=first_attempt.error,
-                                corrected_sql=sql,
-                                database_type=database_type,
-                                was_successful=True
-                            )
-                            logger.info("✨ Learned from successful correction")
+                            # Recorded in the background so the response isn't held up
+                            self._enqueue_learning({
+                                "error_type": first_attempt.error_type,
+                                "original_sql": first_attempt.sql,
+                                "original_error": first_attempt.error,
+                                "corrected_sql": sql,
+                                "database_type": database_type,
+                                "was_successful": True
+                            })
 
                     return {
                         "success": True,
@@ -494,15 +979,16 @@ class SelfCorrectingSQLAgent:
 
                 # Failed - save error for next retry
                 last_error = exec_result["error"]
-                logger.warning(f"❌ Attempt {attempt_num} failed: {last_error[:200]}")
+                logger.warning("❌ Attempt %d failed: %.200s", attempt_num, last_error)
 
                 # If this is the last attempt, don't retry
                 if attempt_num >= self.max_retries:
                     break
 
             except Exception as e:
-                logger.error(f"Exception during attempt {attempt_num}: {e}")
+                logger.error("Exception during attempt %d: %s", attempt_num, e)
                 last_error = str(e)
+                last_diagnosis = None
 
                 # Record failed attempt
                 attempt = CorrectionAttempt(
@@ -520,14 +1006,16 @@ class SelfCorrectingSQLAgent:
                     break
 
         # All retries exhausted
-        logger.error(f"❌ Query failed after {self.max_retries} attempts")
+        logger.error("❌ Query failed after %d attempts", self.max_retries)
         return {
             "success": False,
             "sql": sql or "",
             "error": last_error,
+            "error_preview": _preview(last_error),
             "attempts": attempts,
             "self_corrected": len(attempts) > 1,
-            "total_attempts": len(attempts),
+            # Failed speculative runs share their attempt's number
+            "total_attempts": attempts[-1].attempt_number if attempts else 0,
             "question": question,
             "model_used": model or self.generator.settings.OLLAMA_MODEL,
             "message": f"Failed after {self.max_retries} attempts"
@@ -569,15 +1057,11 @@ class SelfCorrectingSQLAgent:
         last_error = None
         current_sql = sql
 
-        executor = SQLExecutor(
-            max_rows=1000,
-            timeout_seconds=30,
-            allow_write=allow_write
-        )
+        executor = self._get_executor(allow_write)
 
         for attempt_num in range(1, self.max_retries + 1):
             try:
-                logger.info(f"Attempt {attempt_num}/{self.max_retries}: Executing SQL")
+                logger.info("Attempt %d/%d: Executing SQL", attempt_num, self.max_retries)
 
                 # Execute SQL
                 exec_result = await executor.execute_query(
@@ -590,21 +1074,21 @@ class SelfCorrectingSQLAgent:
                     "attempt_number": attempt_num,
                     "sql": current_sql,
                     "error": None if exec_result["success"] else exec_result.get("error"),
-                    "error_type": ErrorType.UNKNOWN.value if not exec_result["success"] else None,
+                    "error_type": _UNKNOWN_VALUE if not exec_result["success"] else None,
                     "success": exec_result["success"],
                     "execution_time_ms": exec_result.get("execution_time_ms"),
                     "row_count": exec_result.get("row_count")
                 }
 
                 if not exec_result["success"]:
-                    error_type = self.diagnostics.categorize_error(exec_result["error"])
-                    attempt_info["error_type"] = error_type.value
+                    diagnosis = self.diagnostics.diagnose(exec_result["error"])
+                    attempt_info["error_type"] = ERROR_TYPE_VALUES[diagnosis.error_type]
 
                 attempts.append(attempt_info)
 
                 if exec_result["success"]:
                     # Success!
-                    logger.info(f"✅ Query succeeded on attempt {attempt_num}/{self.max_retries}")
+                    logger.info("✅ Query succeeded on attempt %d/%d", attempt_num, self.max_retries)
                     return {
                         "success": True,
                         "sql": current_sql,
@@ -616,19 +1100,15 @@ class SelfCorrectingSQLAgent:
 
                 # Failed - try to correct
                 last_error = exec_result["error"]
-                logger.warning(f"❌ Attempt {attempt_num} failed: {last_error[:200]}")
+                logger.warning("❌ Attempt %d failed: %.200s", attempt_num, last_error)
 
                 # If this is the last attempt, don't retry
                 if attempt_num >= self.max_retries:
                     break
 
-                # Generate correction
-                error_type = self.diagnostics.categorize_error(last_error)
-                error_context = self.diagnostics.extract_error_context(last_error, error_type)
-                hints = self.diagnostics.generate_fix_hints(error_type, error_context)
-
+                # Generate correction (error was diagnosed above)
                 # Add hints to error message
-                enhanced_error = f"{last_error}\n\nHints:\n{hints}"
+                enhanced_error = f"{last_error}\n\nHints:\n{diagnosis.hints}"
 
                 # Generate corrected SQL
                 fix_result = await self.generator.fix_sql_error(
@@ -639,10 +1119,10 @@ class SelfCorrectingSQLAgent:
                 )
                 current_sql = fix_result["sql"]
 
-                logger.info(f"Generated corrected SQL: {current_sql[:100]}...")
+                logger.info("Generated corrected SQL: %.100s...", current_sql)
 
             except Exception as e:
-                logger.error(f"Exception during attempt {attempt_num}: {e}")
+                logger.error("Exception during attempt %d: %s", attempt_num, e)
                 last_error = str(e)
 
                 # Record failed attempt
@@ -650,7 +1130,7 @@ class SelfCorrectingSQLAgent:
                     "attempt_number": attempt_num,
                     "sql": current_sql,
                     "error": str(e),
-                    "error_type": ErrorType.UNKNOWN.value,
+                    "error_type": _UNKNOWN_VALUE,
                     "success": False,
                     "execution_time_ms": None,
                     "row_count": None
@@ -660,11 +1140,12 @@ class SelfCorrectingSQLAgent:
                     break
 
         # All retries exhausted
-        logger.error(f"❌ Query failed after {self.max_retries} attempts")
+        logger.error("❌ Query failed after %d attempts", self.max_retries)
         return {
             "success": False,
             "sql": current_sql,
             "final_error": last_error,
+            "error_preview": _preview(last_error),
             "corrections": attempts,
             "attempts": len(attempts),
             "self_corrected": len(attempts) > 1,
@@ -691,7 +1172,7 @@ class SelfCorrectingSQLAgent:
         else:
             return (
                 f"❌ Query failed after {result['total_attempts']} attempts\n"
-                f"Final error: {result['error'][:200]}"
+                f"Final error: {result.get('error_preview') or _preview(result['error'])}"
             )
 
     def get_detailed_report(self, result: Dict[str, Any]) -> Dict[str, Any]:
@@ -704,18 +1185,18 @@ class SelfCorrectingSQLAgent:
         Returns:
             Detailed report dictionary
         """
-        attempts_detail = []
-
-        for attempt in result.get("attempts", []):
-            attempts_detail.append({
+        attempts_detail = [
+            {
                 "attempt": attempt.attempt_number,
-                "sql": attempt.sql[:200] + "..." if len(attempt.sql) > 200 else attempt.sql,
+                "sql": attempt.sql_preview,
                 "success": attempt.success,
-                "error_type": attempt.error_type.value if attempt.error_type else None,
-                "error": attempt.error[:200] if attempt.error else None,
+                "error_type": ERROR_TYPE_VALUES[attempt.error_type] if attempt.error_type else None,
+                "error": attempt.error_preview,
                 "execution_time_ms": attempt.execution_time_ms,
                 "row_count": attempt.row_count
-            })
+            }
+            for attempt in result.get("attempts", ())
+        ]
 
         return {
             "summary": self.get_correction_summary(result),
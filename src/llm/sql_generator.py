@@ -1,6 +1,7 @@
 """SQL Generator using Ollama LLM"""
 import logging
 import re
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 from src.llm.ollama_client import OllamaClient, get_ollama_client
 from src.llm.prompts import (
@@ -10,11 +11,55 @@ from src.llm.prompts import (
     FEW_SHOT_EXAMPLES,
     MULTI_DATABASE_SYSTEM_PROMPT,
     MULTI_DATABASE_QUERY_TEMPLATE,
+    QUERY_EXPLANATION_TEMPLATE,
+    ERROR_CORRECTION_TEMPLATE,
 )
-from src.config.settings import Settings
+from src.config.settings import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+# SQL commands accepted by validate_sql_syntax
+_COMMANDS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+# Precompiled SQLValidator patterns (compiled once instead of per call)
+_COMMAND_RE = re.compile(r'\b(SELECT|INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+# SQL injection patterns, fused into one alternation; the named group that
+# matched maps back to the pattern reported in the validation error
+_SUSPICIOUS_PATTERNS = {
+    "semi_drop": r';\s*DROP',
+    "line_comment": r'--\s*',
+    "block_comment": r'/\*.*\*/',
+    "union_select": r'UNION\s+SELECT',
+    "tautology": r'OR\s+1\s*=\s*1',
+    "quoted_tautology": r'OR\s+\'1\'\s*=\s*\'1\'',
+}
+_SUSPICIOUS_RE = re.compile(
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern in _SUSPICIOUS_PATTERNS.items()),
+    re.IGNORECASE,
+)
+_SQL_FENCE_RE = re.compile(r'```sql\s*')
+_FENCE_RE = re.compile(r'```\s*')
+_PREFIX_RE = re.compile(r'^(SQL Query:|Query:|Answer:|SQLite|PostgreSQL|MySQL|SQL:)\s*', re.IGNORECASE)
+_INLINE_DB_TYPE_RE = re.compile(
+    r'\b(sqlite|postgresql|mysql|mongodb)\s+(?=SELECT|INSERT|UPDATE|DELETE|CREATE|DROP|ALTER)',
+    re.IGNORECASE
+)
+# Multi-database output marker ("DATABASE: name"), matched on stripped lines
+_DB_MARKER_RE = re.compile(r'database:\s*(.*)', re.IGNORECASE)
+# Cheap substring guards so clean_sql_output skips regexes that cannot match
+_PREFIX_STARTS = ('sql', 'query:', 'answer:', 'postgresql', 'mysql')
+_INLINE_DB_TYPES = ('sqlite', 'postgresql', 'mysql', 'mongodb')
+
+
+@dataclass(slots=True)
+class SQLAnalysis:
+    """Result of running every SQLValidator check on one query"""
+    sql: str
+    is_valid: bool
+    error: Optional[str] = None
+    is_read_only: bool = False
+    dangerous_operations: List[str] = field(default_factory=list)
+
 
 class SQLValidator:
     """Validates and sanitizes SQL queries"""
@@ -28,11 +73,21 @@ class SQLValidator:
     # Allowed SELECT-only patterns
     READ_ONLY_PATTERN = re.compile(r"^\s*SELECT\s+", re.IGNORECASE)
 
+    # Single word-bounded alternation over all dangerous keywords
+    DANGEROUS_PATTERN = re.compile(
+        r'\b(' + '|'.join(DANGEROUS_KEYWORDS) + r')\b', re.IGNORECASE
+    )
+
     @staticmethod
     def is_read_only(sql: str) -> bool:
         """Check if query is read-only (SELECT only)"""
-        sql_clean = sql.strip()
-        return bool(SQLValidator.READ_ONLY_PATTERN.match(sql_clean))
+        # Same as READ_ONLY_PATTERN: "SELECT" followed by whitespace
+        sql_clean = sql.lstrip()
+        return (
+            len(sql_clean) > 6
+            and sql_clean[:6].upper() == "SELECT"
+            and sql_clean[6].isspace()
+        )
 
     @staticmethod
     def contains_dangerous_operations(sql: str) -> List[str]:
@@ -42,16 +97,18 @@ class SQLValidator:
         Returns:
             List of dangerous keywords found
         """
-        sql_upper = sql.upper()
-        found = []
+        # Common case: no keyword at all, so skip building the match set
+        if not SQLValidator.DANGEROUS_PATTERN.search(sql):
+            return []
 
-        for keyword in SQLValidator.DANGEROUS_KEYWORDS:
-            # Use word boundaries to avoid false positives
-            pattern = r'\b' + keyword + r'\b'
-            if re.search(pattern, sql_upper):
-                found.append(keyword)
+        # One scan for all keywords; word boundaries avoid false positives
+        matched = {
+            match.group(1).upper()
+            for match in SQLValidator.DANGEROUS_PATTERN.finditer(sql)
+        }
 
-        return found
+        # Report in keyword order
+        return [keyword for keyword in SQLValidator.DANGEROUS_KEYWORDS if keyword in matched]
 
     @staticmethod
     def validate_sql_syntax(sql: str) -> tuple[bool, Optional[str]]:
@@ -61,35 +118,56 @@ class SQLValidator:
         Returns:
             (is_valid, error_message)
         """
-        if not sql or not sql.strip():
+        if not sql:
             return False, "Empty SQL query"
+        return SQLValidator._validate_stripped(sql.strip())
 
-        sql_clean = sql.strip()
+    @staticmethod
+    def _validate_stripped(sql_clean: str) -> tuple[bool, Optional[str]]:
+        """validate_sql_syntax for an already stripped query"""
+        if not sql_clean:
+            return False, "Empty SQL query"
 
-        # Check for basic SQL structure
-        if not re.search(r'\b(SELECT|INSERT|UPDATE|DELETE)\b', sql_clean, re.IGNORECASE):
+        # Check for basic SQL structure (fast path: statement starts with a
+        # command; otherwise look for one anywhere, e.g. after a CTE)
+        first_word = sql_clean.split(None, 1)[0].upper()
+        if first_word not in _COMMANDS and not _COMMAND_RE.search(sql_clean):
             return False, "No valid SQL command found"
 
-        # Check for balanced parentheses
-        if sql_clean.count('(') != sql_clean.count(')'):
-            return False, "Unbalanced parentheses"
+        # Check for balanced parentheses (skip counting when there are none)
+        if '(' in sql_clean or ')' in sql_clean:
+            if sql_clean.count('(') != sql_clean.count(')'):
+                return False, "Unbalanced parentheses"
 
         # Check for SQL injection patterns
-        suspicious_patterns = [
-            r';\s*DROP',
-            r'--\s*',
-            r'/\*.*\*/',
-            r'UNION\s+SELECT',
-            r'OR\s+1\s*=\s*1',
-            r'OR\s+\'1\'\s*=\s*\'1\'',
-        ]
-
-        for pattern in suspicious_patterns:
-            if re.search(pattern, sql_clean, re.IGNORECASE):
-                return False, f"Suspicious pattern detected: {pattern}"
+        suspicious = _SUSPICIOUS_RE.search(sql_clean)
+        if suspicious:
+            return False, f"Suspicious pattern detected: {_SUSPICIOUS_PATTERNS[suspicious.lastgroup]}"
 
         return True, None
 
+    @staticmethod
+    def analyze(sql: str) -> SQLAnalysis:
+        """
+        Run syntax, read-only and dangerous-operation checks in one call
+
+        The query is stripped once and every check runs on that copy.
+
+        Returns:
+            SQLAnalysis with all check results
+        """
+        sql_clean = sql.strip() if sql else ""
+        is_valid, error = SQLValidator._validate_stripped(sql_clean)
+        if not sql_clean:
+            return SQLAnalysis(sql=sql_clean, is_valid=is_valid, error=error)
+        return SQLAnalysis(
+            sql=sql_clean,
+            is_valid=is_valid,
+            error=error,
+            is_read_only=SQLValidator.is_read_only(sql_clean),
+            dangerous_operations=SQLValidator.contains_dangerous_operations(sql_clean),
+        )
+
     @staticmethod
     def clean_sql_output(text: str) -> str:
         """
@@ -98,23 +176,25 @@ class SQLValidator:
         Removes markdown code blocks, explanations, etc.
         """
         # Remove markdown code blocks
-        text = re.sub(r'```sql\s*', '', text)
-        text = re.sub(r'```\s*', '', text)
+        if '```' in text:
+            text = _SQL_FENCE_RE.sub('', text)
+            text = _FENCE_RE.sub('', text)
 
         # Remove common prefixes and database type mentions
-        text = re.sub(r'^(SQL Query:|Query:|Answer:|SQLite|PostgreSQL|MySQL|SQL:)\s*', '', text, flags=re.IGNORECASE)
+        if text[:10].lower().startswith(_PREFIX_STARTS):
+            text = _PREFIX_RE.sub('', text, count=1)
 
         # Remove inline database type mentions (e.g., "SQLite SELECT" -> "SELECT")
-        text = re.sub(r'\b(sqlite|postgresql|mysql|mongodb)\s+(?=SELECT|INSERT|UPDATE|DELETE|CREATE|DROP|ALTER)', '', text, flags=re.IGNORECASE)
+        lowered = text.lower()
+        if any(db_type in lowered for db_type in _INLINE_DB_TYPES):
+            text = _INLINE_DB_TYPE_RE.sub('', text)
 
         # Take only the first statement (before semicolon + newline)
-        lines = text.split('\n')
         sql_lines = []
-
-        for line in lines:
+        for line in text.splitlines():
             line = line.strip()
             # Skip empty lines and comments
-            if not line or line.startswith('--') or line.startswith('/*'):
+            if not line or line.startswith(('--', '/*')):
                 continue
             sql_lines.append(line)
 
@@ -122,10 +202,8 @@ class SQLValidator:
             if line.endswith(';'):
                 break
 
-        sql = ' '.join(sql_lines)
-
-        # Clean up whitespace
-        sql = re.sub(r'\s+', ' ', sql).strip()
+        # Join and collapse whitespace runs in one split/join
+        sql = ' '.join(' '.join(sql_lines).split())
 
         return sql
 
@@ -138,7 +216,7 @@ class SQLGenerator:
         settings: Optional[Settings] = None,
         ollama_client: Optional[OllamaClient] = None,
     ):
-        self.settings = settings or Settings()
+        self.settings = settings or get_settings()
         self.ollama = ollama_client or get_ollama_client(self.settings)
         self.validator = SQLValidator()
 
@@ -205,25 +283,23 @@ class SQLGenerator:
             sql = self.validator.clean_sql_output(raw_output)
 
             # Validate SQL
-            is_valid, error = self.validator.validate_sql_syntax(sql)
-            is_read_only = self.validator.is_read_only(sql)
-            dangerous_ops = self.validator.contains_dangerous_operations(sql)
+            analysis = self.validator.analyze(sql)
 
             warnings = []
 
-            if not is_valid:
-                warnings.append(f"Validation error: {error}")
+            if not analysis.is_valid:
+                warnings.append(f"Validation error: {analysis.error}")
 
-            if not allow_write and not is_read_only:
+            if not allow_write and not analysis.is_read_only:
                 warnings.append("Write operations not allowed. Query may be rejected.")
 
-            if dangerous_ops:
-                warnings.append(f"Dangerous operations detected: {', '.join(dangerous_ops)}")
+            if analysis.dangerous_operations:
+                warnings.append(f"Dangerous operations detected: {', '.join(analysis.dangerous_operations)}")
 
             result = {
                 "sql": sql,
-                "is_valid": is_valid,
-                "is_read_only": is_read_only,
+                "is_valid": analysis.is_valid,
+                "is_read_only": analysis.is_read_only,
                 "warnings": warnings,
                 "raw_output": raw_output,
                 "question": question,
@@ -264,14 +340,7 @@ class SQLGenerator:
             Natural language explanation
         """
         try:
-            prompt = f"""Explain this SQL query in simple terms:
-
-SQL: {sql}
-
-Schema context:
-{schema}
-
-Provide a clear, non-technical explanation."""
+            prompt = QUERY_EXPLANATION_TEMPLATE.format(sql=sql, schema=schema)
 
             explanation = await self.ollama.generate(
                 prompt=prompt,
@@ -305,20 +374,12 @@ Provide a clear, non-technical explanation."""
             Result dictionary with corrected SQL
         """
         try:
-            prompt = f"""This SQL query resulted in an error. Fix it:
-
-Query:
-{sql}
-
-Error:
-{error}
-
-Schema:
-{schema}
-
-Database type: {database_type}
-
-Provide the corrected SQL query ONLY."""
+            prompt = ERROR_CORRECTION_TEMPLATE.format(
+                sql=sql,
+                error=error,
+                schema=schema,
+                database_type=database_type,
+            )
 
             raw_output = await self.ollama.generate(
                 prompt=prompt,
@@ -402,25 +463,23 @@ Provide the corrected SQL query ONLY."""
             for query in queries:
                 sql = query.get("sql", "")
 
-                is_valid, error = self.validator.validate_sql_syntax(sql)
-                is_read_only = self.validator.is_read_only(sql)
-                dangerous_ops = self.validator.contains_dangerous_operations(sql)
+                analysis = self.validator.analyze(sql)
 
-                query["is_valid"] = is_valid
-                query["is_read_only"] = is_read_only
+                query["is_valid"] = analysis.is_valid
+                query["is_read_only"] = analysis.is_read_only
 
-                if not is_valid:
+                if not analysis.is_valid:
                     all_valid = False
-                    warnings.append(f"Query for {query.get('database_name')}: {error}")
+                    warnings.append(f"Query for {query.get('database_name')}: {analysis.error}")
 
-                if not is_read_only:
+                if not analysis.is_read_only:
                     all_read_only = False
                     if not allow_write:
                         warnings.append(f"Query for {query.get('database_name')}: Write operations not allowed")
 
-                if dangerous_ops:
+                if analysis.dangerous_operations:
                     warnings.append(
-                        f"Query for {query.get('database_name')}: Dangerous operations detected: {', '.join(dangerous_ops)}"
+                        f"Query for {query.get('database_name')}: Dangerous operations detected: {', '.join(analysis.dangerous_operations)}"
                     )
 
             result = {
@@ -469,35 +528,35 @@ Provide the corrected SQL query ONLY."""
         current_db = None
         current_sql_lines = []
 
-        lines = raw_output.split("\n")
+        def flush() -> None:
+            # Lines are already stripped, so a single-line join is enough;
+            # clean_sql_output still drops prefixes and inline db names
+            if current_db and current_sql_lines:
+                sql = self.validator.clean_sql_output(" ".join(current_sql_lines))
+                queries.append({"database_name": current_db, "sql": sql})
+            current_sql_lines.clear()
 
-        for line in lines:
+        for line in raw_output.splitlines():
             line_stripped = line.strip()
 
             # Check for database marker
-            if line_stripped.upper().startswith("DATABASE:"):
+            marker = _DB_MARKER_RE.match(line_stripped)
+            if marker:
                 # Save previous query if exists
-                if current_db and current_sql_lines:
-                    sql = " ".join(current_sql_lines).strip()
-                    sql = self.validator.clean_sql_output(sql)
-                    queries.append({"database_name": current_db, "sql": sql})
-                    current_sql_lines = []
+                flush()
 
                 # Extract new database name
-                current_db = line_stripped.split(":", 1)[1].strip()
+                current_db = marker.group(1).strip()
 
             elif line_stripped and current_db:
                 # Skip markdown and comments
-                if line_stripped.startswith("```") or line_stripped.startswith("--"):
+                if line_stripped.startswith(("```", "--")):
                     continue
                 # Collect SQL lines
                 current_sql_lines.append(line_stripped)
 
         # Save last query
-        if current_db and current_sql_lines:
-            sql = " ".join(current_sql_lines).strip()
-            sql = self.validator.clean_sql_output(sql)
-            queries.append({"database_name": current_db, "sql": sql})
+        flush()
 
         # If no database markers found, treat entire output as single query
         if not queries and raw_output.strip():
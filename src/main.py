@@ -4,10 +4,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.config.settings import Settings
+from src.config.settings import get_settings
 from src.database.connection import get_db_manager
 from src.cache.redis_client import get_redis_cache
+from src.llm.ollama_client import get_ollama_client
 from src.middleware.rate_limit import RateLimitMiddleware
+from src.api.responses import ORJSONResponse
+from src.models.examples import add_schema_examples
 from src.api.endpoints import query, health, schema, models, connections, chat, multi_db_query, learned_corrections, result_verification
 
 # Configure logging
@@ -24,7 +27,7 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting Database Guru...")
 
-    settings = Settings()
+    settings = get_settings()
 
     # Initialize database
     logger.info("📊 Initializing database...")
@@ -39,12 +42,20 @@ async def lifespan(app: FastAPI):
     await cache.connect()
     logger.info("✅ Cache ready")
 
+    # Open the shared Ollama HTTP client (connections are pooled across requests)
+    ollama = get_ollama_client(settings)
+    await ollama.connect()
+
+    # Build (and cache) the OpenAPI schema now rather than on the first /docs hit
+    app.openapi()
+
     logger.info("🧙‍♂️ Database Guru is ready!")
 
     yield
 
     # Shutdown
     logger.info("🛑 Shutting down Database Guru...")
+    await ollama.disconnect()
     await cache.disconnect()
     await db_manager.close_async()
     logger.info("👋 Goodbye!")
@@ -56,8 +67,22 @@ app = FastAPI(
     description="AI-powered database expert that converts natural language to SQL",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Merge docs examples into the generated OpenAPI schema
+_default_openapi = app.openapi
+
+
+def custom_openapi():
+    """Build the OpenAPI schema once and attach response examples"""
+    if app.openapi_schema is None:
+        add_schema_examples(_default_openapi())
+    return app.openapi_schema
+
+
+app.openapi = custom_openapi
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -93,4 +118,14 @@ if __name__ == "__main__":
     ║          Starting on port 8000        ║
     ╚══════════════════════════════════════╝
     """)
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    settings = get_settings()
+    # uvicorn[standard] picks uvloop and httptools automatically when available;
+    # the file-watching reloader only runs in DEBUG (it needs an import string)
+    uvicorn.run(
+        "src.main:app" if settings.DEBUG else app,
+        host="0.0.0.0",
+        port=8000,
+        reload=settings.DEBUG,
+        loop="auto",
+        http="auto",
+    )
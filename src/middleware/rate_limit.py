@@ -1,6 +1,8 @@
 """Rate limiting middleware using Redis"""
 import logging
+import math
 import time
+from collections import OrderedDict
 from typing import Callable
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
@@ -8,15 +10,34 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 logger = logging.getLogger(__name__)
 
+# Paths that are never rate limited
+_BYPASS_PATHS = frozenset({"/health", "/", "/docs", "/openapi.json", "/redoc"})
+
+# Clock for token refills; module-level so tests can swap it without
+# patching time.monotonic for the whole process
+_monotonic = time.monotonic
+
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
     Simple rate limiting middleware using in-memory storage
 
+    Each client gets a token bucket holding up to ``calls`` tokens that
+    refills at ``calls / period`` tokens per second; a request spends one.
+
     For production, this should use Redis for distributed rate limiting
     """
 
-    def __init__(self, app, calls: int = 100, period: int = 60):
+    # Requests between sweeps of idle client records
+    SWEEP_INTERVAL = 1000
+
+    def __init__(
+        self,
+        app,
+        calls: int = 100,
+        period: int = 60,
+        max_clients: int = 100_000,
+    ):
         """
         Initialize rate limiter
 
@@ -24,53 +45,61 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             app: FastAPI application
             calls: Number of calls allowed
             period: Time period in seconds
+            max_clients: Maximum client records kept (least recently seen are evicted)
         """
         super().__init__(app)
         self.calls = calls
         self.period = period
-        self.clients = {}  # In production, use Redis
+        self.max_clients = max_clients
+        self.rate = calls / period  # Tokens refilled per second
+        self.clients: OrderedDict = OrderedDict()  # In production, use Redis
+        self._requests_since_sweep = 0
+
+    def _sweep(self, now: float) -> None:
+        """Drop client records whose bucket has refilled completely"""
+        idle = [
+            client_ip for client_ip, bucket in self.clients.items()
+            if bucket["tokens"] + (now - bucket["ts"]) * self.rate >= self.calls
+        ]
+        for client_ip in idle:
+            del self.clients[client_ip]
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request with rate limiting"""
 
-        # Skip rate limiting for health check
-        if request.url.path in ["/health", "/", "/docs", "/openapi.json"]:
+        # Skip rate limiting for health check and docs (scope path, no URL object)
+        if request.scope["path"] in _BYPASS_PATHS:
             return await call_next(request)
 
         # Get client identifier (IP address)
         client_ip = request.client.host
 
-        # Get current time
-        now = time.time()
-
-        # Initialize client record if not exists
-        if client_ip not in self.clients:
-            self.clients[client_ip] = {"calls": [], "blocked_until": 0}
-
-        client_data = self.clients[client_ip]
-
-        # Check if client is blocked
-        if client_data["blocked_until"] > now:
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
-                    "error": "Rate limit exceeded",
-                    "detail": f"Too many requests. Please try again later.",
-                    "retry_after": int(client_data["blocked_until"] - now),
-                },
-            )
-
-        # Clean up old calls outside the time window
-        client_data["calls"] = [
-            call_time for call_time in client_data["calls"]
-            if call_time > now - self.period
-        ]
+        # Get current time (monotonic, immune to wall-clock jumps)
+        now = _monotonic()
+
+        # Periodically reclaim records of clients that went quiet
+        self._requests_since_sweep += 1
+        if self._requests_since_sweep >= self.SWEEP_INTERVAL:
+            self._requests_since_sweep = 0
+            self._sweep(now)
+
+        # Initialize client bucket if not exists, else mark it recently seen
+        bucket = self.clients.get(client_ip)
+        if bucket is None:
+            bucket = {"tokens": float(self.calls), "ts": now}
+            self.clients[client_ip] = bucket
+            if len(self.clients) > self.max_clients:
+                self.clients.popitem(last=False)
+        else:
+            self.clients.move_to_end(client_ip)
+
+        # Refill tokens for the time elapsed since the last request
+        tokens = min(self.calls, bucket["tokens"] + (now - bucket["ts"]) * self.rate)
+        bucket["ts"] = now
 
         # Check if rate limit exceeded
-        if len(client_data["calls"]) >= self.calls:
-            # Block client for the remaining period
-            oldest_call = min(client_data["calls"])
-            client_data["blocked_until"] = oldest_call + self.period
+        if tokens < 1:
+            bucket["tokens"] = tokens
 
             logger.warning(f"Rate limit exceeded for {client_ip}")
 
@@ -79,30 +108,48 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 content={
                     "error": "Rate limit exceeded",
                     "detail": f"Maximum {self.calls} requests per {self.period} seconds allowed",
-                    "retry_after": self.period,
+                    "retry_after": math.ceil((1 - tokens) / self.rate),
                 },
             )
 
-        # Add current call
-        client_data["calls"].append(now)
+        # Spend a token for the current call
+        tokens -= 1
+        bucket["tokens"] = tokens
 
         # Process request
         response = await call_next(request)
 
-        # Add rate limit headers
-        remaining = self.calls - len(client_data["calls"])
+        # Add rate limit headers (reset is when the bucket is full again)
+        refill_seconds = (self.calls - tokens) / self.rate
         response.headers["X-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(now + self.period))
+        response.headers["X-RateLimit-Remaining"] = str(int(tokens))
+        response.headers["X-RateLimit-Reset"] = str(int(time.time() + refill_seconds))
 
         return response
 
 
+# Sliding-window check done atomically on the Redis server:
+# KEYS[1] = client key; ARGV = window start, now, calls, period
+_SLIDING_WINDOW_LUA = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[1])
+local count = redis.call('ZCARD', KEYS[1])
+local limit = tonumber(ARGV[3])
+if count >= limit then
+    return {0, 0}
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {1, limit - count - 1}
+"""
+
+
 class RedisRateLimiter:
     """
     Redis-based rate limiter (for production use)
 
-    This would be used in production for distributed rate limiting
+    This would be used in production for distributed rate limiting.
+    The window check runs as one Lua script, so each request costs a
+    single round trip and concurrent requests cannot overshoot the limit.
     """
 
     def __init__(self, redis_client, calls: int = 100, period: int = 60):
@@ -117,6 +164,7 @@ class RedisRateLimiter:
         self.redis = redis_client
         self.calls = calls
         self.period = period
+        self._script = None
 
     async def is_allowed(self, client_id: str) -> tuple[bool, int]:
         """
@@ -131,19 +179,12 @@ class RedisRateLimiter:
         key = f"ratelimit:{client_id}"
         now = time.time()
 
-        # Use Redis sorted set to track requests
-        # Remove old requests
-        await self.redis.redis.zremrangebyscore(key, 0, now - self.period)
-
-        # Count requests in current window
-        count = await self.redis.redis.zcard(key)
-
-        if count >= self.calls:
-            return False, 0
-
-        # Add current request
-        await self.redis.redis.zadd(key, {str(now): now})
-        await self.redis.redis.expire(key, self.period)
+        # Register lazily: the connection only exists after connect()
+        if self._script is None:
+            self._script = self.redis.redis.register_script(_SLIDING_WINDOW_LUA)
 
-        remaining = self.calls - count - 1
-        return True, remaining
+        allowed, remaining = await self._script(
+            keys=[key],
+            args=[now - self.period, now, self.calls, self.period],
+        )
+        return bool(allowed), int(remaining)
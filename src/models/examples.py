@@ -0,0 +1,57 @@
+"""Example payloads for the OpenAPI docs
+
+Kept out of the runtime models and merged into the generated schema by
+add_schema_examples().
+"""
+from typing import Any, Dict
+
+SCHEMA_EXAMPLES: Dict[str, Dict[str, Any]] = {
+    "QueryResponse": {
+        "query_id": 123,
+        "question": "Show me all customers from California",
+        "sql": "SELECT * FROM customers WHERE state = 'CA'",
+        "is_valid": True,
+        "is_read_only": True,
+        "warnings": [],
+        "results": [
+            {"id": 1, "name": "John Doe", "state": "CA"},
+            {"id": 2, "name": "Jane Smith", "state": "CA"}
+        ],
+        "row_count": 2,
+        "execution_time_ms": 45.2,
+        "cached": False,
+        "timestamp": "2024-01-01T12:00:00"
+    },
+    "HealthCheckResponse": {
+        "status": "healthy",
+        "version": "1.0.0",
+        "services": {
+            "database": True,
+            "cache": True,
+            "llm": True
+        },
+        "timestamp": "2024-01-01T12:00:00"
+    },
+    "ErrorResponse": {
+        "error": "Invalid query",
+        "detail": "Question cannot be empty",
+        "timestamp": "2024-01-01T12:00:00"
+    },
+}
+
+
+def add_schema_examples(openapi_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Attach SCHEMA_EXAMPLES to the matching component schemas
+
+    Args:
+        openapi_schema: Schema produced by fastapi.openapi.utils.get_openapi
+
+    Returns:
+        The same schema, updated in place
+    """
+    components = openapi_schema.get("components", {}).get("schemas", {})
+    for name, example in SCHEMA_EXAMPLES.items():
+        if name in components:
+            components[name]["example"] = example
+    return openapi_schema
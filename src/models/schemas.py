@@ -1,31 +1,51 @@
 """Pydantic schemas for API requests and responses"""
+import time
 from datetime import datetime
-from typing import Optional, List, Any, Dict
-from pydantic import BaseModel, Field, validator
+from typing import Annotated, Optional, List, Any, Dict
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter
+
+
+# Last formatted response timestamp, reused within the same millisecond
+_last_timestamp_ms = -1
+_last_timestamp_iso = ""
+
+
+def utc_now_iso() -> str:
+    """UTC ISO timestamp for responses, reformatted at most once per millisecond"""
+    global _last_timestamp_ms, _last_timestamp_iso
+    now = time.time()
+    now_ms = int(now * 1000)
+    if now_ms != _last_timestamp_ms:
+        _last_timestamp_iso = datetime.utcfromtimestamp(now).isoformat()
+        _last_timestamp_ms = now_ms
+    return _last_timestamp_iso
 
 
 class QueryRequest(BaseModel):
     """Request model for natural language query"""
-    question: str = Field(
+    # Stripped and length-checked inside pydantic-core, so blank or oversized
+    # questions are rejected without calling back into Python
+    question: Annotated[str, StringConstraints(strip_whitespace=True)] = Field(
         ...,
         description="Natural language question",
         min_length=3,
         max_length=500,
-        example="Show me all customers from California"
+        examples=["Show me all customers from California"]
     )
     database_type: str = Field(
         default="postgresql",
         description="Type of database",
-        example="postgresql"
+        examples=["postgresql"]
     )
-    schema: Optional[str] = Field(
+    schema_info: Optional[str] = Field(
         default=None,
+        alias="schema",
         description="Database schema information (optional)",
     )
     model: Optional[str] = Field(
         default=None,
         description="Ollama model to use (e.g., 'llama3', 'mistral', 'codellama'). Uses default if not specified.",
-        example="llama3"
+        examples=["llama3"]
     )
     allow_write: bool = Field(
         default=False,
@@ -36,11 +56,7 @@ class QueryRequest(BaseModel):
         description="Use cached results if available",
     )
 
-    @validator('question')
-    def question_not_empty(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Question cannot be empty')
-        return v.strip()
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class QueryResponse(BaseModel):
@@ -86,29 +102,11 @@ class QueryResponse(BaseModel):
         description="Whether result was from cache"
     )
     timestamp: str = Field(
-        default_factory=lambda: datetime.utcnow().isoformat(),
+        default_factory=utc_now_iso,
         description="Response timestamp"
     )
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query_id": 123,
-                "question": "Show me all customers from California",
-                "sql": "SELECT * FROM customers WHERE state = 'CA'",
-                "is_valid": True,
-                "is_read_only": True,
-                "warnings": [],
-                "results": [
-                    {"id": 1, "name": "John Doe", "state": "CA"},
-                    {"id": 2, "name": "Jane Smith", "state": "CA"}
-                ],
-                "row_count": 2,
-                "execution_time_ms": 45.2,
-                "cached": False,
-                "timestamp": "2024-01-01T12:00:00"
-            }
-        }
+    model_config = ConfigDict(frozen=True)
 
 
 class ExplainRequest(BaseModel):
@@ -118,17 +116,22 @@ class ExplainRequest(BaseModel):
         description="SQL query to explain",
         min_length=5,
     )
-    schema: Optional[str] = Field(
+    schema_info: Optional[str] = Field(
         default=None,
+        alias="schema",
         description="Database schema context"
     )
 
+    model_config = ConfigDict(populate_by_name=True)
+
 
 class ExplainResponse(BaseModel):
     """Response model for SQL explanation"""
     sql: str = Field(..., description="Original SQL query")
     explanation: str = Field(..., description="Natural language explanation")
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=utc_now_iso)
+
+    model_config = ConfigDict(frozen=True)
 
 
 class QueryHistoryResponse(BaseModel):
@@ -145,8 +148,12 @@ class QueryHistoryResponse(BaseModel):
     model_used: Optional[str]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(
+        from_attributes=True,
+        frozen=True,
+        extra="ignore",
+        protected_namespaces=(),
+    )
 
 
 class HealthCheckResponse(BaseModel):
@@ -158,38 +165,19 @@ class HealthCheckResponse(BaseModel):
         description="Status of individual services"
     )
     timestamp: str = Field(
-        default_factory=lambda: datetime.utcnow().isoformat()
+        default_factory=utc_now_iso
     )
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "status": "healthy",
-                "version": "1.0.0",
-                "services": {
-                    "database": True,
-                    "cache": True,
-                    "llm": True
-                },
-                "timestamp": "2024-01-01T12:00:00"
-            }
-        }
+    model_config = ConfigDict(frozen=True)
 
 
 class ErrorResponse(BaseModel):
     """Response model for errors"""
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Detailed error information")
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=utc_now_iso)
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "error": "Invalid query",
-                "detail": "Question cannot be empty",
-                "timestamp": "2024-01-01T12:00:00"
-            }
-        }
+    model_config = ConfigDict(frozen=True)
 
 
 class StatsResponse(BaseModel):
@@ -204,3 +192,9 @@ class StatsResponse(BaseModel):
         default_factory=list,
         description="Most frequent queries"
     )
+
+    model_config = ConfigDict(frozen=True)
+
+
+# Validators/serializers built once at import for hot list endpoints
+QUERY_HISTORY_LIST_ADAPTER = TypeAdapter(List[QueryHistoryResponse])
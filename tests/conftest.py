@@ -0,0 +1,33 @@
+"""Shared pytest fixtures"""
+import asyncio
+
+import pytest
+
+
+def pytest_configure(config):
+    """Register the marker for scripts that need running services"""
+    config.addinivalue_line(
+        "markers", "integration: needs live services; run with pytest -m integration"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Leave integration scripts out unless a -m expression selects them"""
+    if config.option.markexpr:
+        return
+
+    selected, deselected = [], []
+    for item in items:
+        (deselected if item.get_closest_marker("integration") else selected).append(item)
+
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """Run every asyncio test on one event loop for the whole session"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
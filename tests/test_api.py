@@ -1,10 +1,15 @@
 """Test script for Database Guru API"""
 import asyncio
 import httpx
+import orjson
+import pytest
 
 
 BASE_URL = "http://localhost:8000"
 
+# Needs the API server running on localhost:8000; run with: pytest -m integration
+pytestmark = pytest.mark.integration
+
 
 async def test_api():
     """Test the Database Guru API endpoints"""
@@ -17,7 +22,7 @@ async def test_api():
         print("-" * 70)
         response = await client.get(f"{BASE_URL}/health")
         print(f"Status: {response.status_code}")
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"Overall Status: {data['status']}")
         print(f"Services:")
         for service, status in data['services'].items():
@@ -29,7 +34,7 @@ async def test_api():
         print("-" * 70)
         response = await client.get(f"{BASE_URL}/")
         print(f"Status: {response.status_code}")
-        print(f"Response: {response.json()}")
+        print(f"Response: {orjson.loads(response.content)}")
 
         # Test 3: Process Natural Language Query
         print("\n3️⃣  Testing Query Processing")
@@ -45,7 +50,7 @@ async def test_api():
         print(f"Status: {response.status_code}")
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Query ID: {data['query_id']}")
             print(f"Generated SQL: {data['sql']}")
             print(f"Valid: {data['is_valid']}")
@@ -61,7 +66,7 @@ async def test_api():
         print("-" * 70)
         response = await client.post(f"{BASE_URL}/api/query/", json=query_data)
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Cached: {data['cached']} (should be True)")
             print(f"SQL: {data['sql'][:60]}...")
 
@@ -76,7 +81,7 @@ async def test_api():
 
         response = await client.post(f"{BASE_URL}/api/query/", json=query_data2)
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Generated SQL: {data['sql']}")
 
         # Test 6: Query History
@@ -85,7 +90,7 @@ async def test_api():
         response = await client.get(f"{BASE_URL}/api/query/history?limit=5")
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
-            history = response.json()
+            history = orjson.loads(response.content)
             print(f"Found {len(history)} queries in history")
             for i, item in enumerate(history[:3], 1):
                 print(f"  {i}. {item['natural_language_query'][:50]}...")
@@ -96,7 +101,7 @@ async def test_api():
         response = await client.get(f"{BASE_URL}/api/query/stats")
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
-            stats = response.json()
+            stats = orjson.loads(response.content)
             print(f"Total Queries: {stats['total_queries']}")
             print(f"Avg Execution Time: {stats['average_execution_time_ms']} ms")
 
@@ -109,7 +114,7 @@ async def test_api():
         response = await client.post(f"{BASE_URL}/api/query/explain", json=explain_data)
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Explanation: {data['explanation'][:150]}...")
 
         # Test 9: Rate Limiting Headers
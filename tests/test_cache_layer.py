@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process cache layer in front of Redis
+
+Run with: pytest tests/test_cache_layer.py -v
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from src.config.settings import Settings
+from src.cache.redis_client import RedisCache
+
+
+def make_cache():
+    """Build a RedisCache backed by a mocked Redis client"""
+    cache = RedisCache(Settings())
+    cache.redis = MagicMock()
+    cache.redis.get = AsyncMock(return_value='{"sql": "SELECT 1"}')
+    cache.redis.setex = AsyncMock()
+    cache.redis.delete = AsyncMock(return_value=1)
+    return cache
+
+
+class TestLocalCacheLayer:
+    """Test repeated hits are served without a Redis round-trip"""
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_is_kept_locally(self):
+        """Test a Redis hit populates the local layer"""
+        cache = make_cache()
+        assert await cache.get("query:a") == {"sql": "SELECT 1"}
+        assert await cache.get("query:a") == {"sql": "SELECT 1"}
+        cache.redis.get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_set_is_served_locally(self):
+        """Test values written through set() are read back without Redis"""
+        cache = make_cache()
+        await cache.set("query:b", {"sql": "SELECT 2"})
+        assert await cache.get("query:b") == {"sql": "SELECT 2"}
+        cache.redis.get.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_delete_evicts_local_entry(self):
+        """Test delete() also drops the local copy"""
+        cache = make_cache()
+        await cache.set("query:c", {"sql": "SELECT 3"})
+        await cache.delete("query:c")
+        cache.redis.get = AsyncMock(return_value=None)
+        assert await cache.get("query:c") is None
@@ -1,26 +1,77 @@
 """Tests for the correction learning system"""
 import pytest
 from datetime import datetime
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
-from src.database.models import Base, LearnedCorrection
+from src.database.models import LearnedCorrection
 from src.llm.correction_learner import CorrectionLearner
 from src.llm.self_correcting_agent import ErrorType
 
 
+@pytest.fixture(scope="session")
+def engine():
+    """Create the in-memory test database once for the whole run"""
+    # StaticPool keeps a single connection, so every test sees the same
+    # :memory: database and the schema is only created once
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work with pysqlite
+    @event.listens_for(engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    # The learner only touches learned_corrections, which has no foreign keys
+    LearnedCorrection.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
 @pytest.fixture
-def db_session():
-    """Create a test database session"""
-    # Use in-memory SQLite for testing
-    engine = create_engine("sqlite:///:memory:")
-    Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
+def db_session(engine):
+    """Create a test database session rolled back after each test"""
+    connection = engine.connect()
+    trans = connection.begin()
+    # Commits inside the code under test release a SAVEPOINT instead of
+    # ending the outer transaction
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
 
     yield session
 
     session.close()
+    trans.rollback()
+    connection.close()
+
+
+def seed_corrections(db_session, rows):
+    """Insert learned corrections directly in one executemany, returning their ids"""
+    ids = db_session.execute(
+        insert(LearnedCorrection).returning(LearnedCorrection.id), rows
+    ).scalars().all()
+    db_session.commit()
+    return ids
+
+
+@pytest.fixture
+def seeded_correction(db_session, request):
+    """Store one learned correction directly and return its id"""
+    values = {
+        "database_type": "postgresql",
+        "times_applied": 1,
+        "confidence_score": 0.7,
+        **request.param,
+    }
+    values.setdefault("error_pattern", values["original_error"])
+    return seed_corrections(db_session, [values])[0]
 
 
 @pytest.fixture
@@ -44,9 +95,7 @@ async def test_learn_from_correction(learner, db_session):
     assert correction_id is not None
 
     # Verify it was stored
-    correction = db_session.query(LearnedCorrection).filter(
-        LearnedCorrection.id == correction_id
-    ).first()
+    correction = db_session.get(LearnedCorrection, correction_id)
 
     assert correction is not None
     assert correction.error_type == ErrorType.TABLE_NOT_FOUND.value
@@ -82,27 +131,22 @@ async def test_learn_duplicate_correction(learner, db_session):
     assert correction_id_1 == correction_id_2
 
     # Verify times_applied was incremented
-    correction = db_session.query(LearnedCorrection).filter(
-        LearnedCorrection.id == correction_id_1
-    ).first()
+    correction = db_session.get(LearnedCorrection, correction_id_1)
 
     assert correction.times_applied == 2
     assert correction.confidence_score > 0.7  # Increased confidence
 
 
 @pytest.mark.asyncio
-async def test_find_applicable_corrections_exact_match(learner, db_session):
+@pytest.mark.parametrize("seeded_correction", [{
+    "error_type": ErrorType.TABLE_NOT_FOUND.value,
+    "original_sql": "SELECT * FROM prodcuts",
+    "original_error": 'table "prodcuts" does not exist',
+    "corrected_sql": "SELECT * FROM products",
+    "table_pattern": "prodcuts",
+}], indirect=True)
+async def test_find_applicable_corrections_exact_match(learner, db_session, seeded_correction):
     """Test finding applicable corrections with exact match"""
-    # Learn a correction
-    await learner.learn_from_correction(
-        error_type=ErrorType.TABLE_NOT_FOUND,
-        original_sql="SELECT * FROM prodcuts",
-        original_error='table "prodcuts" does not exist',
-        corrected_sql="SELECT * FROM products",
-        database_type="postgresql",
-        was_successful=True
-    )
-
     # Search for similar error
     corrections = await learner.find_applicable_corrections(
         error_type=ErrorType.TABLE_NOT_FOUND,
@@ -115,18 +159,14 @@ async def test_find_applicable_corrections_exact_match(learner, db_session):
 
 
 @pytest.mark.asyncio
-async def test_find_applicable_corrections_different_database(learner, db_session):
+@pytest.mark.parametrize("seeded_correction", [{
+    "error_type": ErrorType.SYNTAX_ERROR.value,
+    "original_sql": "SELECT * FROM products",
+    "original_error": 'syntax error near "FROM"',
+    "corrected_sql": "SELECT * FROM products LIMIT 10",
+}], indirect=True)
+async def test_find_applicable_corrections_different_database(learner, db_session, seeded_correction):
     """Test that corrections are database-specific"""
-    # Learn a correction for PostgreSQL
-    await learner.learn_from_correction(
-        error_type=ErrorType.SYNTAX_ERROR,
-        original_sql="SELECT * FROM products",
-        original_error='syntax error near "FROM"',
-        corrected_sql="SELECT * FROM products LIMIT 10",
-        database_type="postgresql",
-        was_successful=True
-    )
-
     # Search for MySQL - should not find the PostgreSQL correction
     corrections = await learner.find_applicable_corrections(
         error_type=ErrorType.SYNTAX_ERROR,
@@ -137,22 +177,79 @@ async def test_find_applicable_corrections_different_database(learner, db_sessio
     assert len(corrections) == 0
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("seeded_correction", [{
+    "error_type": ErrorType.TABLE_NOT_FOUND.value,
+    "original_sql": "SELECT * FROM prodcuts",
+    "original_error": 'table "prodcuts" does not exist',
+    "corrected_sql": "SELECT * FROM products",
+    "table_pattern": "prodcuts",
+}], indirect=True)
+async def test_find_applicable_corrections_cached(learner, db_session, seeded_correction):
+    """Test lookups are cached per lookup filter until a correction is learned"""
+    async def lookup(error_message, error_type=ErrorType.TABLE_NOT_FOUND):
+        return await learner.find_applicable_corrections(
+            error_type=error_type,
+            error_message=error_message,
+            database_type="postgresql"
+        )
+
+    first = await lookup('table "prodcuts" does not exist (line 1)')
+    assert await lookup('table "prodcuts" does not exist (line 2)') is first
+
+    # Different missing columns filter differently, so they don't share results
+    col1 = await lookup('column "col1" does not exist', ErrorType.COLUMN_NOT_FOUND)
+    assert await lookup('column "col2" does not exist', ErrorType.COLUMN_NOT_FOUND) is not col1
+
+    # Learning a correction invalidates lookups for that error type
+    await learner.learn_from_correction(
+        error_type=ErrorType.TABLE_NOT_FOUND,
+        original_sql="SELECT * FROM prodcuts",
+        original_error='table "prodcuts" does not exist',
+        corrected_sql="SELECT * FROM products",
+        database_type="postgresql",
+        was_successful=True
+    )
+    assert await lookup('table "prodcuts" does not exist (line 1)') is not first
+
+
+@pytest.mark.asyncio
+async def test_find_applicable_corrections_failure_not_cached(learner, db_session, monkeypatch):
+    """Test a failed lookup is retried instead of served from the cache"""
+    def broken_query(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(db_session, "query", broken_query)
+    assert await learner.find_applicable_corrections(
+        error_type=ErrorType.TABLE_NOT_FOUND,
+        error_message='table "orders" does not exist',
+        database_type="postgresql"
+    ) == []
+    assert not learner._lookup_cache
+
+    monkeypatch.undo()
+    await learner.find_applicable_corrections(
+        error_type=ErrorType.TABLE_NOT_FOUND,
+        error_message='table "orders" does not exist',
+        database_type="postgresql"
+    )
+    assert len(learner._lookup_cache) == 1
+
+
 @pytest.mark.asyncio
 async def test_find_applicable_corrections_confidence_threshold(learner, db_session):
     """Test that low-confidence corrections are filtered out"""
     # Create a low-confidence correction manually
-    low_confidence = LearnedCorrection(
-        error_type=ErrorType.UNKNOWN.value,
-        error_pattern="some error",
-        database_type="postgresql",
-        original_sql="SELECT * FROM test",
-        original_error="some error",
-        corrected_sql="SELECT * FROM test2",
-        confidence_score=0.3,  # Below threshold
-        times_applied=0
-    )
-    db_session.add(low_confidence)
-    db_session.commit()
+    seed_corrections(db_session, [{
+        "error_type": ErrorType.UNKNOWN.value,
+        "error_pattern": "some error",
+        "database_type": "postgresql",
+        "original_sql": "SELECT * FROM test",
+        "original_error": "some error",
+        "corrected_sql": "SELECT * FROM test2",
+        "confidence_score": 0.3,  # Below threshold
+        "times_applied": 0,
+    }])
 
     # Search should not return low-confidence corrections
     corrections = await learner.find_applicable_corrections(
@@ -165,17 +262,16 @@ async def test_find_applicable_corrections_confidence_threshold(learner, db_sess
 
 
 @pytest.mark.asyncio
-async def test_apply_learned_correction_success(learner, db_session):
+@pytest.mark.parametrize("seeded_correction", [{
+    "error_type": ErrorType.TABLE_NOT_FOUND.value,
+    "original_sql": "SELECT * FROM users",
+    "original_error": 'table "users" does not exist',
+    "corrected_sql": "SELECT * FROM user_table",
+    "table_pattern": "users",
+}], indirect=True)
+async def test_apply_learned_correction_success(learner, db_session, seeded_correction):
     """Test applying a learned correction and updating stats"""
-    # Learn a correction
-    correction_id = await learner.learn_from_correction(
-        error_type=ErrorType.TABLE_NOT_FOUND,
-        original_sql="SELECT * FROM users",
-        original_error='table "users" does not exist',
-        corrected_sql="SELECT * FROM user_table",
-        database_type="postgresql",
-        was_successful=True
-    )
+    correction_id = seeded_correction
 
     # Apply it successfully
     await learner.apply_learned_correction(
@@ -185,9 +281,7 @@ async def test_apply_learned_correction_success(learner, db_session):
     )
 
     # Verify stats were updated
-    correction = db_session.query(LearnedCorrection).filter(
-        LearnedCorrection.id == correction_id
-    ).first()
+    correction = db_session.get(LearnedCorrection, correction_id)
 
     assert correction.times_applied == 2  # Initial + this application
     assert correction.confidence_score > 0.7  # Increased
@@ -195,17 +289,16 @@ async def test_apply_learned_correction_success(learner, db_session):
 
 
 @pytest.mark.asyncio
-async def test_apply_learned_correction_failure(learner, db_session):
+@pytest.mark.parametrize("seeded_correction", [{
+    "error_type": ErrorType.COLUMN_NOT_FOUND.value,
+    "original_sql": "SELECT name FROM products",
+    "original_error": 'column "name" does not exist',
+    "corrected_sql": "SELECT product_name FROM products",
+    "column_pattern": "name",
+}], indirect=True)
+async def test_apply_learned_correction_failure(learner, db_session, seeded_correction):
     """Test that failed applications decrease confidence"""
-    # Learn a correction
-    correction_id = await learner.learn_from_correction(
-        error_type=ErrorType.COLUMN_NOT_FOUND,
-        original_sql="SELECT name FROM products",
-        original_error='column "name" does not exist',
-        corrected_sql="SELECT product_name FROM products",
-        database_type="postgresql",
-        was_successful=True
-    )
+    correction_id = seeded_correction
 
     initial_confidence = 0.7
 
@@ -217,9 +310,7 @@ async def test_apply_learned_correction_failure(learner, db_session):
     )
 
     # Verify confidence decreased
-    correction = db_session.query(LearnedCorrection).filter(
-        LearnedCorrection.id == correction_id
-    ).first()
+    correction = db_session.get(LearnedCorrection, correction_id)
 
     assert correction.confidence_score < initial_confidence
 
@@ -227,24 +318,29 @@ async def test_apply_learned_correction_failure(learner, db_session):
 @pytest.mark.asyncio
 async def test_get_learning_stats(learner, db_session):
     """Test getting learning statistics"""
-    # Learn several corrections
-    await learner.learn_from_correction(
-        error_type=ErrorType.TABLE_NOT_FOUND,
-        original_sql="SELECT * FROM test1",
-        original_error='table "test1" does not exist',
-        corrected_sql="SELECT * FROM test_table1",
-        database_type="postgresql",
-        was_successful=True
-    )
-
-    await learner.learn_from_correction(
-        error_type=ErrorType.COLUMN_NOT_FOUND,
-        original_sql="SELECT col FROM test",
-        original_error='column "col" does not exist',
-        corrected_sql="SELECT column_name FROM test",
-        database_type="postgresql",
-        was_successful=True
-    )
+    # Seed several corrections
+    seed_corrections(db_session, [
+        {
+            "error_type": ErrorType.TABLE_NOT_FOUND.value,
+            "error_pattern": 'table "<name>" does not exist',
+            "database_type": "postgresql",
+            "original_sql": "SELECT * FROM test1",
+            "original_error": 'table "test1" does not exist',
+            "corrected_sql": "SELECT * FROM test_table1",
+            "times_applied": 1,
+            "confidence_score": 0.7,
+        },
+        {
+            "error_type": ErrorType.COLUMN_NOT_FOUND.value,
+            "error_pattern": 'column "<name>" does not exist',
+            "database_type": "postgresql",
+            "original_sql": "SELECT col FROM test",
+            "original_error": 'column "col" does not exist',
+            "corrected_sql": "SELECT column_name FROM test",
+            "times_applied": 1,
+            "confidence_score": 0.7,
+        },
+    ])
 
     # Get stats
     stats = await learner.get_learning_stats()
@@ -255,42 +351,32 @@ async def test_get_learning_stats(learner, db_session):
     assert ErrorType.COLUMN_NOT_FOUND.value in stats["by_error_type"]
 
 
-@pytest.mark.asyncio
-async def test_extract_table_name(learner):
+@pytest.mark.parametrize("error,expected", [
+    ('relation "products" does not exist', "products"),
+    ("no such table: user_data", "user_data"),
+])
+def test_extract_table_name(learner, error, expected):
     """Test extracting table name from error message"""
-    error = 'relation "products" does not exist'
-    table_name = learner._extract_table_name(error)
-    assert table_name == "products"
+    assert learner._extract_table_name(error) == expected
 
-    error2 = 'no such table: user_data'
-    table_name2 = learner._extract_table_name(error2)
-    assert table_name2 == "user_data"
 
-
-@pytest.mark.asyncio
-async def test_extract_column_name(learner):
+@pytest.mark.parametrize("error,expected", [
+    ('column "price" does not exist', "price"),
+    ("no such column: user_id", "user_id"),
+])
+def test_extract_column_name(learner, error, expected):
     """Test extracting column name from error message"""
-    error = 'column "price" does not exist'
-    column_name = learner._extract_column_name(error)
-    assert column_name == "price"
+    assert learner._extract_column_name(error) == expected
 
-    error2 = 'no such column: user_id'
-    column_name2 = learner._extract_column_name(error2)
-    assert column_name2 == "user_id"
 
-
-@pytest.mark.asyncio
-async def test_normalize_error(learner):
+@pytest.mark.parametrize("error", [
+    'table "products" does not exist',
+    'table "users" does not exist',
+])
+def test_normalize_error(learner, error):
     """Test error normalization for pattern matching"""
-    error1 = 'table "products" does not exist'
-    error2 = 'table "users" does not exist'
-
-    normalized1 = learner._normalize_error(error1)
-    normalized2 = learner._normalize_error(error2)
-
-    # Both should normalize to the same pattern
-    assert normalized1 == normalized2
-    assert "<name>" in normalized1
+    # Table names are replaced so both errors share one pattern
+    assert learner._normalize_error(error) == 'table "<name>" does not exist'
 
 
 @pytest.mark.asyncio
@@ -321,18 +407,15 @@ async def test_learning_disabled(db_session):
 
 
 @pytest.mark.asyncio
-async def test_table_pattern_matching(learner, db_session):
+@pytest.mark.parametrize("seeded_correction", [{
+    "error_type": ErrorType.TABLE_NOT_FOUND.value,
+    "original_sql": "SELECT * FROM products",
+    "original_error": 'table "products" does not exist',
+    "corrected_sql": "SELECT * FROM product_table",
+    "table_pattern": "products",
+}], indirect=True)
+async def test_table_pattern_matching(learner, db_session, seeded_correction):
     """Test that corrections are matched by table pattern"""
-    # Learn a correction for a specific table
-    await learner.learn_from_correction(
-        error_type=ErrorType.TABLE_NOT_FOUND,
-        original_sql="SELECT * FROM products",
-        original_error='table "products" does not exist',
-        corrected_sql="SELECT * FROM product_table",
-        database_type="postgresql",
-        was_successful=True
-    )
-
     # Search with same table name
     corrections = await learner.find_applicable_corrections(
         error_type=ErrorType.TABLE_NOT_FOUND,
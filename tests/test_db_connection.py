@@ -1,15 +1,19 @@
 """Quick test script for database connection"""
 import asyncio
-from src.config.settings import Settings
+import pytest
+from src.config.settings import get_settings
 from src.database.connection import get_db_manager
 
+# Needs the configured application database; run with: pytest -m integration
+pytestmark = pytest.mark.integration
+
 
 async def test_connection():
     """Test database connection"""
     print("🧪 Testing Database Connection...\n")
 
     # Load settings
-    settings = Settings()
+    settings = get_settings()
     print(f"Database URL: {settings.DATABASE_URL}")
 
     # Get database manager
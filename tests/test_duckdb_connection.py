@@ -3,6 +3,7 @@
 Test DuckDB connection functionality
 """
 import asyncio
+import pytest
 import sys
 from pathlib import Path
 
@@ -13,6 +14,9 @@ from src.core.connection_tester import ConnectionTester
 from src.core.user_db_connector import UserDatabaseConnector
 from src.database.models import DatabaseConnection
 
+# Needs the sample DuckDB file (scripts/create_sample_duckdb.py); run with: pytest -m integration
+pytestmark = pytest.mark.integration
+
 
 async def test_duckdb_connection():
     """Test DuckDB connection"""
@@ -69,25 +73,24 @@ async def test_duckdb_connection():
             # Check if it's a sync session (DuckDB)
             is_sync = isinstance(session, Session)
 
-            # Test simple query
+            # Test product count and table listing in one statement
+            overview_sql = text(
+                "SELECT 'count' AS kind, CAST(COUNT(*) AS VARCHAR) AS value FROM products "
+                "UNION ALL "
+                "SELECT 'table', table_name FROM information_schema.tables "
+                "WHERE table_schema = 'main'"
+            )
             if is_sync:
-                result = session.execute(text("SELECT COUNT(*) as count FROM products"))
+                result = session.execute(overview_sql)
             else:
-                result = await session.execute(text("SELECT COUNT(*) as count FROM products"))
-
-            row = result.fetchone()
-            print(f"  Products count: {row[0]}")
-
-            # Test table listing
-            if is_sync:
-                result = session.execute(
-                    text("SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'")
-                )
-            else:
-                result = await session.execute(
-                    text("SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'")
-                )
-            tables = [row[0] for row in result.fetchall()]
+                result = await session.execute(overview_sql)
+
+            tables = []
+            for kind, value in result.fetchall():
+                if kind == "count":
+                    print(f"  Products count: {value}")
+                else:
+                    tables.append(value)
             print(f"  Tables found: {', '.join(tables)}")
 
             # Test sample query
@@ -1,10 +1,16 @@
 """End-to-end test for Database Guru with real SQL execution"""
 import asyncio
 import httpx
+import itertools
+import orjson
+import pytest
 
 
 BASE_URL = "http://localhost:8000"
 
+# Needs the API server, Ollama and an active database connection; run with: pytest -m integration
+pytestmark = pytest.mark.integration
+
 
 async def test_end_to_end():
     """Test the complete Database Guru workflow"""
@@ -18,7 +24,7 @@ async def test_end_to_end():
         print("1️⃣  Health Check")
         print("-" * 80)
         response = await client.get(f"{BASE_URL}/health")
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"Status: {data['status']}")
         for service, healthy in data['services'].items():
             emoji = "✅" if healthy else "❌"
@@ -34,7 +40,7 @@ async def test_end_to_end():
         print("-" * 80)
         response = await client.get(f"{BASE_URL}/api/schema/")
         if response.status_code == 200:
-            schema = response.json()
+            schema = orjson.loads(response.content)
             print(f"✅ Tables: {schema['table_count']}")
             print(f"✅ Columns: {schema['column_count']}")
             print(f"✅ Relationships: {schema['relationship_count']}")
@@ -60,20 +66,26 @@ async def test_end_to_end():
             "List all products in the Electronics category",
         ]
 
-        for i, question in enumerate(test_queries, 1):
-            print(f"\n📝 Query {i}: {question}")
-            print("   " + "-" * 70)
+        # Send the queries concurrently (bounded), then report in order
+        semaphore = asyncio.Semaphore(8)
 
+        async def run_query(question):
             query_data = {
                 "question": question,
                 "database_type": "postgresql",
                 "use_cache": False,  # Disable cache for testing
             }
+            async with semaphore:
+                return await client.post(f"{BASE_URL}/api/query/", json=query_data)
 
-            response = await client.post(f"{BASE_URL}/api/query/", json=query_data)
+        responses = await asyncio.gather(*(run_query(q) for q in test_queries))
+
+        for i, (question, response) in enumerate(zip(test_queries, responses), 1):
+            print(f"\n📝 Query {i}: {question}")
+            print("   " + "-" * 70)
 
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
 
                 print(f"   ✓ Query ID: {result['query_id']}")
                 print(f"   ✓ Valid: {result['is_valid']}")
@@ -92,7 +104,7 @@ async def test_end_to_end():
                     # Show first few results
                     if result['results']:
                         print(f"\n      First row:")
-                        for key, value in list(result['results'][0].items())[:3]:
+                        for key, value in itertools.islice(result['results'][0].items(), 3):
                             print(f"        • {key}: {value}")
 
                         if result['row_count'] > 1:
@@ -117,7 +129,7 @@ async def test_end_to_end():
         response = await client.post(f"{BASE_URL}/api/query/explain", json=explain_data)
 
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"SQL: {result['sql'][:60]}...")
             print(f"\nExplanation:")
             print(f"{result['explanation'][:200]}...")
@@ -131,7 +143,7 @@ async def test_end_to_end():
         response = await client.get(f"{BASE_URL}/api/query/history?limit=5")
 
         if response.status_code == 200:
-            history = response.json()
+            history = orjson.loads(response.content)
             print(f"✅ Found {len(history)} recent queries\n")
 
             for i, item in enumerate(history[:3], 1):
@@ -150,7 +162,7 @@ async def test_end_to_end():
         response = await client.get(f"{BASE_URL}/api/query/stats")
 
         if response.status_code == 200:
-            stats = response.json()
+            stats = orjson.loads(response.content)
             print(f"Total Queries: {stats['total_queries']}")
             if stats['average_execution_time_ms']:
                 print(f"Average Execution Time: {stats['average_execution_time_ms']:.2f}ms")
@@ -1,5 +1,6 @@
 """Test script for LLM layer"""
 import asyncio
+import pytest
 from src.config.settings import Settings
 from src.llm import OllamaClient, SQLGenerator, get_ollama_client
 
@@ -18,6 +19,9 @@ Relationships:
 - order_items.product_id -> products.id
 """
 
+# Needs a running Ollama server; run with: pytest -m integration
+pytestmark = pytest.mark.integration
+
 
 async def test_ollama_connection():
     """Test basic Ollama connectivity"""
@@ -1,10 +1,14 @@
 """Test script for model management"""
 import asyncio
 import httpx
+import pytest
 
 
 BASE_URL = "http://localhost:8000"
 
+# Needs the API server and Ollama with at least one model installed; run with: pytest -m integration
+pytestmark = pytest.mark.integration
+
 
 async def test_models():
     """Test model management features"""
@@ -14,13 +18,21 @@ async def test_models():
     print()
 
     async with httpx.AsyncClient(timeout=60.0) as client:
+        # Tests 1-3 are independent reads, so fetch them concurrently
+        models_response, details_response, recommended_response = await asyncio.gather(
+            client.get(f"{BASE_URL}/api/models/"),
+            client.get(f"{BASE_URL}/api/models/details"),
+            client.get(f"{BASE_URL}/api/models/recommended"),
+        )
+
         # Test 1: List Available Models
         print("1️⃣  Listing Available Models")
         print("-" * 80)
-        response = await client.get(f"{BASE_URL}/api/models/")
+        response = models_response
+        models_data = None
 
         if response.status_code == 200:
-            data = response.json()
+            data = models_data = response.json()
             print(f"✅ Found {data['count']} models:")
             for model in data['models']:
                 marker = "⭐" if model == data['default_model'] else "  "
@@ -34,7 +46,7 @@ async def test_models():
         # Test 2: Get Model Details
         print("2️⃣  Model Details")
         print("-" * 80)
-        response = await client.get(f"{BASE_URL}/api/models/details")
+        response = details_response
 
         if response.status_code == 200:
             data = response.json()
@@ -49,7 +61,7 @@ async def test_models():
         # Test 3: Recommended Models
         print("3️⃣  Recommended Models")
         print("-" * 80)
-        response = await client.get(f"{BASE_URL}/api/models/recommended")
+        response = recommended_response
 
         if response.status_code == 200:
             data = response.json()
@@ -68,10 +80,9 @@ async def test_models():
 
         test_question = "Show me all customers from California"
 
-        # Get list of available models
-        models_resp = await client.get(f"{BASE_URL}/api/models/")
-        if models_resp.status_code == 200:
-            available_models = models_resp.json()['models'][:2]  # Test first 2 models
+        # Reuse the model list fetched for test 1
+        if models_data:
+            available_models = models_data['models'][:2]  # Test first 2 models
 
             for model_name in available_models:
                 print(f"\n   Testing with model: {model_name}")
@@ -97,9 +108,8 @@ async def test_models():
         print("-" * 80)
 
         # Get default model
-        models_resp = await client.get(f"{BASE_URL}/api/models/")
-        if models_resp.status_code == 200:
-            default_model = models_resp.json()['default_model']
+        if models_data:
+            default_model = models_data['default_model']
 
             response = await client.get(f"{BASE_URL}/api/models/test/{default_model}")
 
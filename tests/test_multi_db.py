@@ -2,9 +2,13 @@
 import asyncio
 import httpx
 import json
+import pytest
 
 BASE_URL = "http://localhost:8000/api"
 
+# Needs the API server with at least one saved database connection; run with: pytest -m integration
+pytestmark = pytest.mark.integration
+
 
 async def test_multi_database_queries():
     """Test multi-database query functionality"""
@@ -80,55 +84,63 @@ async def test_multi_database_queries():
         else:
             print(f"   Error: {response.status_code} - {response.text}")
 
-        # Step 4: Test multi-database comparison query
-        if len(connection_ids) > 1:
-            print("\n4. Testing multi-database comparison query...")
-            query_request = {
-                "question": "Compare the total number of records in each database",
-                "chat_session_id": session_id,
-                "allow_write": False,
-                "use_cache": False,
-            }
-
-            response = await client.post(f"{BASE_URL}/multi-query/", json=query_request)
-            if response.status_code == 200:
-                result = response.json()
-                print(f"   ✅ Multi-database query successful!")
-                print(f"   Databases queried: {result['total_databases_queried']}")
-                print(f"   Total execution time: {result['total_execution_time_ms']}ms")
-
-                for db_result in result["database_results"]:
-                    print(f"\n   Database: {db_result['connection_name']}")
-                    print(f"   SQL: {db_result['sql']}")
-                    print(f"   Success: {db_result['success']}")
-                    if db_result['success']:
-                        print(f"   Rows: {db_result['row_count']}")
-            else:
-                print(f"   Error: {response.status_code} - {response.text}")
-
-        # Step 5: View chat history
-        print("\n5. Viewing chat history...")
-        response = await client.get(f"{BASE_URL}/chat/sessions/{session_id}/messages")
-        if response.status_code == 200:
-            messages = response.json()
-            print(f"   ✅ Found {len(messages)} message(s) in chat:")
-            for msg in messages:
-                print(f"\n   [{msg['role'].upper()}] {msg['content'][:100]}...")
-                if msg.get('databases_used'):
-                    print(f"   Databases used: {json.dumps(msg['databases_used'], indent=2)}")
-        else:
-            print(f"   Error: {response.status_code}")
-
-        # Step 6: Query with explicit connection IDs (bypass chat session)
-        print("\n6. Testing direct query with explicit connection IDs...")
-        query_request = {
+        # Step 6 doesn't touch the chat session, so start it now and let it
+        # run alongside steps 4 and 5
+        direct_query = asyncio.create_task(client.post(f"{BASE_URL}/multi-query/", json={
             "question": "List all tables in the database",
             "connection_ids": [connections[0]["id"]],
             "allow_write": False,
             "use_cache": False,
-        }
+        }))
+
+        try:
+            # Step 4: Test multi-database comparison query
+            if len(connection_ids) > 1:
+                print("\n4. Testing multi-database comparison query...")
+                query_request = {
+                    "question": "Compare the total number of records in each database",
+                    "chat_session_id": session_id,
+                    "allow_write": False,
+                    "use_cache": False,
+                }
+
+                response = await client.post(f"{BASE_URL}/multi-query/", json=query_request)
+                if response.status_code == 200:
+                    result = response.json()
+                    print(f"   ✅ Multi-database query successful!")
+                    print(f"   Databases queried: {result['total_databases_queried']}")
+                    print(f"   Total execution time: {result['total_execution_time_ms']}ms")
+
+                    for db_result in result["database_results"]:
+                        print(f"\n   Database: {db_result['connection_name']}")
+                        print(f"   SQL: {db_result['sql']}")
+                        print(f"   Success: {db_result['success']}")
+                        if db_result['success']:
+                            print(f"   Rows: {db_result['row_count']}")
+                else:
+                    print(f"   Error: {response.status_code} - {response.text}")
 
-        response = await client.post(f"{BASE_URL}/multi-query/", json=query_request)
+            # Step 5: View chat history
+            print("\n5. Viewing chat history...")
+            response = await client.get(f"{BASE_URL}/chat/sessions/{session_id}/messages")
+            if response.status_code == 200:
+                messages = response.json()
+                print(f"   ✅ Found {len(messages)} message(s) in chat:")
+                for msg in messages:
+                    print(f"\n   [{msg['role'].upper()}] {msg['content'][:100]}...")
+                    if msg.get('databases_used'):
+                        print(f"   Databases used: {json.dumps(msg['databases_used'], indent=2)}")
+            else:
+                print(f"   Error: {response.status_code}")
+        except BaseException:
+            # Don't leave the step 6 request running if steps 4-5 fail
+            direct_query.cancel()
+            await asyncio.gather(direct_query, return_exceptions=True)
+            raise
+
+        # Step 6: Query with explicit connection IDs (bypass chat session)
+        print("\n6. Testing direct query with explicit connection IDs...")
+        response = await direct_query
         if response.status_code == 200:
             result = response.json()
             print(f"   ✅ Direct query successful!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for Ollama client connection handling
+
+Run with: pytest tests/test_ollama_client.py -v
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from src.config.settings import Settings
+from src.llm.ollama_client import OllamaClient
+
+
+class TestOllamaClientConnection:
+    """Test the pooled HTTP client lifecycle"""
+
+    @pytest.mark.asyncio
+    async def test_connect_reuses_open_client(self):
+        """Test repeated connect() keeps the same pooled client"""
+        client = OllamaClient(Settings())
+        await client.connect()
+        first = client.client
+        await client.connect()
+        assert client.client is first
+        await client.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_reconnect_after_disconnect(self):
+        """Test disconnect() clears the client so connect() opens a new one"""
+        client = OllamaClient(Settings())
+        await client.connect()
+        first = client.client
+        await client.disconnect()
+        assert client.client is None
+        await client.connect()
+        assert client.client is not first
+        await client.disconnect()
+
+
+class TestOllamaGenerateCoalescing:
+    """Test identical concurrent generations share one request"""
+
+    def _client_with_post(self, post):
+        client = OllamaClient(Settings())
+        client.client = MagicMock()
+        client.client.post = post
+        return client
+
+    @staticmethod
+    def _response(text):
+        response = MagicMock()
+        response.json.return_value = {"response": text}
+        return response
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self):
+        """Test concurrent identical prompts trigger a single HTTP call"""
+        async def post(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return self._response("SELECT 1;")
+
+        mock_post = AsyncMock(side_effect=post)
+        client = self._client_with_post(mock_post)
+
+        results = await asyncio.gather(
+            client.generate("count rows", system="sys"),
+            client.generate("count rows", system="sys"),
+        )
+
+        assert results == ["SELECT 1;", "SELECT 1;"]
+        assert mock_post.await_count == 1
+        assert client._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_different_requests_not_shared(self):
+        """Test different prompts or temperatures are sent separately"""
+        mock_post = AsyncMock(return_value=self._response("SELECT 1;"))
+        client = self._client_with_post(mock_post)
+
+        await asyncio.gather(
+            client.generate("count rows"),
+            client.generate("count rows", temperature=0.5),
+            client.generate("list rows"),
+        )
+
+        assert mock_post.await_count == 3
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for Rate Limiting Middleware
+
+Run with: pytest tests/test_rate_limit.py -v
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from src.middleware.rate_limit import RateLimitMiddleware, RedisRateLimiter
+
+
+def make_client(calls: int = 3, period: int = 60) -> TestClient:
+    """Build a tiny app wrapped in the rate limiter"""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, calls=calls, period=period)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class TestRateLimitMiddleware:
+    """Test in-memory rate limiting"""
+
+    def test_remaining_header_counts_down(self):
+        """Test X-RateLimit-Remaining decreases per call"""
+        client = make_client(calls=3)
+        remaining = [
+            client.get("/ping").headers["X-RateLimit-Remaining"] for _ in range(3)
+        ]
+        assert remaining == ["2", "1", "0"]
+
+    def test_blocks_after_limit(self):
+        """Test requests over the limit get 429"""
+        client = make_client(calls=2)
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 200
+        response = client.get("/ping")
+        assert response.status_code == 429
+        assert response.json()["error"] == "Rate limit exceeded"
+
+    def test_health_not_limited(self):
+        """Test health checks skip rate limiting"""
+        client = make_client(calls=1)
+        for _ in range(3):
+            assert client.get("/health").status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_client_records_are_bounded(self):
+        """Test least recently seen clients are evicted past max_clients"""
+        limiter = RateLimitMiddleware(FastAPI(), calls=5, max_clients=2)
+
+        async def call_next(request):
+            return Response("ok")
+
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.3"):
+            request = Request({
+                "type": "http", "method": "GET", "path": "/ping",
+                "headers": [], "query_string": b"", "client": (ip, 1234),
+            })
+            await limiter.dispatch(request, call_next)
+
+        assert list(limiter.clients) == ["10.0.0.1", "10.0.0.3"]
+
+    def test_tokens_refill_over_time(self, monkeypatch):
+        """Test a blocked client is allowed again once a token refills"""
+        clock = [100.0]
+        monkeypatch.setattr("src.middleware.rate_limit._monotonic", lambda: clock[0])
+        client = make_client(calls=2, period=60)
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 200
+
+        blocked = client.get("/ping")
+        assert blocked.status_code == 429
+        assert blocked.json()["retry_after"] == 30
+
+        # 30 seconds at 2 calls / 60s refills exactly one token
+        clock[0] += 30
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 429
+
+    def test_sweep_drops_idle_clients(self):
+        """Test sweep keeps only clients whose bucket is not yet full"""
+        limiter = RateLimitMiddleware(FastAPI(), calls=6, period=60)
+        now = 1000.0
+        limiter.clients["idle"] = {"tokens": 0.0, "ts": 900.0}
+        limiter.clients["active"] = {"tokens": 2.0, "ts": 990.0}
+        limiter._sweep(now)
+        assert set(limiter.clients) == {"active"}
+
+
+class TestRedisRateLimiter:
+    """Test Redis rate limiting"""
+
+    @pytest.mark.asyncio
+    async def test_single_script_call_per_request(self):
+        """Test the window check is one script call, registered once"""
+        script = AsyncMock(side_effect=[[1, 1], [0, 0]])
+        redis_client = MagicMock()
+        redis_client.redis.register_script.return_value = script
+        limiter = RedisRateLimiter(redis_client, calls=2, period=60)
+
+        assert await limiter.is_allowed("10.0.0.1") == (True, 1)
+        assert await limiter.is_allowed("10.0.0.1") == (False, 0)
+
+        redis_client.redis.register_script.assert_called_once()
+        assert script.await_count == 2
+        kwargs = script.await_args.kwargs
+        assert kwargs["keys"] == ["ratelimit:10.0.0.1"]
+        assert kwargs["args"][2:] == [2, 60]
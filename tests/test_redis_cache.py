@@ -1,9 +1,13 @@
 """Test script for Redis cache layer"""
 import asyncio
+import pytest
 from src.config.settings import Settings
 from src.cache.redis_client import get_redis_cache
 from src.cache.decorators import cached, cache_query_result, CacheNamespace
 
+# Needs a running Redis server; run with: pytest -m integration
+pytestmark = pytest.mark.integration
+
 
 async def test_basic_operations():
     """Test basic Redis cache operations"""
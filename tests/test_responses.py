@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for API JSON responses
+
+Run with: pytest tests/test_responses.py -v
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from src.api.responses import ORJSONResponse, model_response
+from src.models.schemas import QueryResponse
+
+
+class TestORJSONResponse:
+    """Test JSON rendering of API responses"""
+
+    def test_renders_database_values(self):
+        """Test Decimal and datetime values from result rows serialize"""
+        response = ORJSONResponse({
+            "total": Decimal("12.50"),
+            "created_at": datetime(2024, 1, 2, 3, 4, 5),
+        })
+        assert json.loads(response.body) == {
+            "total": 12.5,
+            "created_at": "2024-01-02T03:04:05",
+        }
+
+    def test_model_response(self):
+        """Test response models are dumped in JSON mode"""
+        response = model_response(QueryResponse(
+            question="How many products?",
+            sql="SELECT COUNT(*) FROM products",
+            is_valid=True,
+            is_read_only=True,
+            results=[{"count": 3}],
+        ))
+        assert response.status_code == 200
+        body = json.loads(response.body)
+        assert body["sql"] == "SELECT COUNT(*) FROM products"
+        assert body["results"] == [{"count": 3}]
@@ -27,6 +27,12 @@ SAMPLE_SCHEMA = {
 }
 
 
+@pytest.fixture(scope="module")
+def fixer():
+    """Create one fixer for the module; quick_fix never mutates it"""
+    return SchemaAwareFixer(SAMPLE_SCHEMA)
+
+
 class TestFuzzyMatcher:
     """Test fuzzy string matching"""
 
@@ -74,16 +80,44 @@ class TestFuzzyMatcher:
         assert match is not None
         assert match[0] == "products"
         assert match[1] > 0.6
+        assert match == FuzzyMatcher.find_closest("prodct", candidates, threshold=0.6)[0]
+        assert FuzzyMatcher.find_best_match("zzz", candidates) is None
+
+    def test_difflib_fallback(self, monkeypatch):
+        """Test the difflib path ranks and filters like the RapidFuzz path"""
+        import src.llm.schema_aware_fixer as schema_aware_fixer
+        monkeypatch.setattr(schema_aware_fixer, "fuzz", None)
+        monkeypatch.setattr(schema_aware_fixer, "process", None)
+
+        candidates = ["orders", "Products", "product_id", "customers"]
+        matches = FuzzyMatcher.find_closest("prodcuts", candidates, threshold=0.6)
+
+        assert [name for name, _ in matches] == ["Products", "product_id"]
+        assert matches[0][1] == 0.875
+
+    @pytest.mark.parametrize("use_rapidfuzz", [True, False])
+    def test_prelowered_candidates(self, monkeypatch, use_rapidfuzz):
+        """Test a name-to-lowercase mapping matches like the plain list"""
+        if not use_rapidfuzz:
+            import src.llm.schema_aware_fixer as schema_aware_fixer
+            monkeypatch.setattr(schema_aware_fixer, "fuzz", None)
+            monkeypatch.setattr(schema_aware_fixer, "process", None)
+
+        candidates = ["orders", "Products", "product_id", "customers"]
+        choices = {name: name.lower() for name in candidates}
+
+        assert FuzzyMatcher.find_closest("PRODcuts", choices) == (
+            FuzzyMatcher.find_closest("PRODcuts", candidates)
+        )
+        assert FuzzyMatcher.find_best_match("PRODcuts", choices) == (
+            FuzzyMatcher.find_best_match("PRODcuts", candidates)
+        )
+        assert FuzzyMatcher.find_best_match("PRODcuts", choices)[0] == "Products"
 
 
 class TestSchemaAwareFixer:
     """Test schema-aware SQL fixer"""
 
-    @pytest.fixture
-    def fixer(self):
-        """Create fixer instance with sample schema"""
-        return SchemaAwareFixer(SAMPLE_SCHEMA)
-
     def test_init_builds_caches(self, fixer):
         """Test that initialization builds lookup caches"""
         assert len(fixer.table_names) == 4
@@ -94,6 +128,11 @@ class TestSchemaAwareFixer:
         assert "price" in fixer.columns_by_table["products"]
 
         assert len(fixer.all_columns) > 0
+        # Deduplicated in schema order
+        assert fixer.all_columns[:6] == [
+            "id", "name", "price", "category_id", "stock_quantity", "email"
+        ]
+        assert len(fixer.all_columns) == len(set(fixer.all_columns))
 
     def test_fix_table_typo(self, fixer):
         """Test fixing table name typo"""
@@ -146,6 +185,34 @@ class TestSchemaAwareFixer:
         assert fix.success is True
         assert fix.corrected_value == "price"
 
+    @pytest.mark.parametrize("use_rapidfuzz", [True, False])
+    @pytest.mark.parametrize("sql,error_type,error_msg,expected", [
+        ("SELECT * FROM prodcuts", ErrorType.TABLE_NOT_FOUND, 'relation "prodcuts" does not exist', "products"),
+        ("SELECT * FROM custmers", ErrorType.TABLE_NOT_FOUND, 'relation "custmers" does not exist', "customers"),
+        ("SELECT * FROM order", ErrorType.TABLE_NOT_FOUND, 'relation "order" does not exist', "orders"),
+        ("SELECT * FROM catgories", ErrorType.TABLE_NOT_FOUND, 'relation "catgories" does not exist', "categories"),
+        ("SELECT * FROM xyz", ErrorType.TABLE_NOT_FOUND, 'relation "xyz" does not exist', None),
+        ("SELECT nam FROM products", ErrorType.COLUMN_NOT_FOUND, 'column "nam" does not exist', "name"),
+        ("SELECT pric FROM products", ErrorType.COLUMN_NOT_FOUND, 'column "pric" does not exist', "price"),
+        ("SELECT emial FROM customers", ErrorType.COLUMN_NOT_FOUND, 'column "emial" does not exist', "email"),
+        ("SELECT stock FROM products", ErrorType.COLUMN_NOT_FOUND, 'column "stock" does not exist', None),
+    ])
+    def test_fixes_match_across_backends(self, monkeypatch, use_rapidfuzz, sql, error_type, error_msg, expected):
+        """Test RapidFuzz and difflib pick the same quick fixes despite different metrics"""
+        if not use_rapidfuzz:
+            import src.llm.schema_aware_fixer as schema_aware_fixer
+            monkeypatch.setattr(schema_aware_fixer, "fuzz", None)
+            monkeypatch.setattr(schema_aware_fixer, "process", None)
+
+        fix = SchemaAwareFixer(SAMPLE_SCHEMA).quick_fix(
+            sql=sql,
+            error_type=error_type,
+            error_message=error_msg
+        )
+
+        assert fix.success is (expected is not None)
+        assert fix.corrected_value == expected
+
     def test_no_fix_for_unknown_error(self, fixer):
         """Test that unknown error types return no fix"""
         sql = "SELECT * FROM products"
@@ -203,6 +270,16 @@ class TestSchemaAwareFixer:
         table2 = fixer._identify_table_from_sql(sql2)
         assert table2 == "products"
 
+    def test_identify_table_is_cached(self, fixer):
+        """Test repeated SQL is answered from the cache, including misses"""
+        sql = "SELECT * FROM warehouses"
+        assert fixer._identify_table_from_sql(sql) is None
+        assert sql in fixer._table_for_sql
+
+        fixer._table_for_sql[sql] = "orders"
+        assert fixer._identify_table_from_sql(sql) == "orders"
+        del fixer._table_for_sql[sql]
+
     def test_replace_table_name(self, fixer):
         """Test replacing table name in SQL"""
         sql = "SELECT * FROM prodcuts WHERE id = 1"
@@ -319,10 +396,6 @@ class TestQuickFixDataclass:
 class TestIntegrationScenarios:
     """Test real-world integration scenarios"""
 
-    @pytest.fixture
-    def fixer(self):
-        return SchemaAwareFixer(SAMPLE_SCHEMA)
-
     def test_ecommerce_query_typo(self, fixer):
         """Test realistic e-commerce query with typo"""
         sql = "SELECT p.name, p.pric FROM prodcuts p WHERE p.stock_quantity > 0"
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for API request/response schemas
+
+Run with: pytest tests/test_schemas.py -v
+"""
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+from src.models.examples import add_schema_examples
+from src.models.schemas import (
+    QueryRequest,
+    ExplainRequest,
+    ExplainResponse,
+    QUERY_HISTORY_LIST_ADAPTER,
+    utc_now_iso,
+)
+
+
+class TestQueryRequest:
+    """Test query request validation"""
+
+    def test_question_is_stripped(self):
+        """Test surrounding whitespace is removed from the question"""
+        assert QueryRequest(question="  list products  ").question == "list products"
+
+    def test_blank_question_rejected(self):
+        """Test whitespace-only questions are rejected"""
+        with pytest.raises(ValidationError):
+            QueryRequest(question="     ")
+
+    def test_length_checked_after_strip(self):
+        """Test padding cannot sneak a too-short question past min_length"""
+        with pytest.raises(ValidationError):
+            QueryRequest(question="   ab   ")
+        with pytest.raises(ValidationError):
+            QueryRequest(question="x" * 501)
+
+    def test_schema_alias(self):
+        """Test the JSON 'schema' key still populates schema_info"""
+        request = QueryRequest.model_validate({"question": "list products", "schema": "products(id)"})
+        assert request.schema_info == "products(id)"
+        assert QueryRequest(question="list products", schema_info="x").schema_info == "x"
+        assert request.model_dump(by_alias=True)["schema"] == "products(id)"
+
+    def test_explain_schema_alias(self):
+        """Test ExplainRequest accepts the 'schema' key"""
+        assert ExplainRequest(sql="SELECT 1", schema="t(id)").schema_info == "t(id)"
+
+
+class TestQueryHistoryAdapter:
+    """Test the prebuilt query history list adapter"""
+
+    def test_validates_orm_rows_and_dumps_json(self):
+        """Test ORM-style objects validate and serialize to JSON bytes"""
+        row = SimpleNamespace(
+            id=1,
+            natural_language_query="list products",
+            generated_sql="SELECT * FROM products",
+            sql_validated=True,
+            executed=True,
+            execution_time_ms=1.5,
+            result_count=3,
+            error_message=None,
+            database_type="sqlite",
+            model_used="llama3",
+            created_at=datetime(2024, 1, 1, 12, 0, 0),
+        )
+        history = QUERY_HISTORY_LIST_ADAPTER.validate_python([row], from_attributes=True)
+        assert history[0].generated_sql == "SELECT * FROM products"
+        assert json.loads(QUERY_HISTORY_LIST_ADAPTER.dump_json(history))[0]["created_at"] == "2024-01-01T12:00:00"
+
+
+class TestResponseTimestamp:
+    """Test the shared response timestamp factory"""
+
+    def test_iso_format(self):
+        """Test timestamps parse as ISO datetimes close to now"""
+        stamp = datetime.fromisoformat(utc_now_iso())
+        assert abs((datetime.utcnow() - stamp).total_seconds()) < 5
+
+    def test_used_by_responses(self):
+        """Test response models default their timestamp from the factory"""
+        assert ExplainResponse(sql="SELECT 1", explanation="one").timestamp
+
+
+class TestSchemaExamples:
+    """Test docs examples are merged into the OpenAPI schema"""
+
+    def test_examples_attached(self):
+        """Test known components get their example and others are untouched"""
+        schema = {"components": {"schemas": {"QueryResponse": {}, "StatsResponse": {}}}}
+        add_schema_examples(schema)
+        components = schema["components"]["schemas"]
+        assert components["QueryResponse"]["example"]["query_id"] == 123
+        assert "example" not in components["StatsResponse"]
+
+
+class TestResponseModels:
+    """Test response model configuration"""
+
+    def test_responses_are_frozen(self):
+        """Test built responses cannot be mutated after construction"""
+        response = ExplainResponse(sql="SELECT 1", explanation="one")
+        with pytest.raises(ValidationError):
+            response.explanation = "two"
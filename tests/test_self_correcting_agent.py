@@ -11,52 +11,71 @@ from src.llm.self_correcting_agent import (
     SelfCorrectingSQLAgent,
     ErrorDiagnostics,
     ErrorType,
-    CorrectionAttempt
+    CorrectionAttempt,
+    _fixer_cache,
+    _fix_memory
 )
+from src.llm.correction_learner import CorrectionLearner
 
 
-class TestErrorDiagnostics:
-    """Test error categorization and diagnosis"""
+def generated(sql):
+    """Canned SQLGenerator.generate_sql response for the given SQL"""
+    return {
+        "sql": sql,
+        "is_valid": True,
+        "is_read_only": True,
+        "warnings": [],
+        "model_used": "test-model"
+    }
 
-    def test_categorize_syntax_error(self):
-        """Test syntax error detection"""
-        error = "syntax error at or near 'SLECT'"
-        result = ErrorDiagnostics.categorize_error(error)
-        assert result == ErrorType.SYNTAX_ERROR
 
-    def test_categorize_table_not_found(self):
-        """Test table not found error detection"""
-        error = 'relation "products" does not exist'
-        result = ErrorDiagnostics.categorize_error(error)
-        assert result == ErrorType.TABLE_NOT_FOUND
+def fixed(sql):
+    """Canned SQLGenerator.fix_sql_error response for the given SQL"""
+    return {"sql": sql, "is_valid": True, "warnings": []}
 
-    def test_categorize_column_not_found(self):
-        """Test column not found error detection"""
-        error = 'column "pric" does not exist'
-        result = ErrorDiagnostics.categorize_error(error)
-        assert result == ErrorType.COLUMN_NOT_FOUND
-
-    def test_categorize_type_mismatch(self):
-        """Test type mismatch error detection"""
-        error = "operator does not exist: integer = text"
-        result = ErrorDiagnostics.categorize_error(error)
-        assert result == ErrorType.TYPE_MISMATCH
-
-    def test_categorize_timeout(self):
-        """Test timeout error detection"""
-        error = "query timeout exceeded"
-        result = ErrorDiagnostics.categorize_error(error)
-        assert result == ErrorType.TIMEOUT
-
-    def test_extract_table_context(self):
+
+def returns(result):
+    """Plain coroutine stub that always returns result"""
+    async def stub(*args, **kwargs):
+        return result
+    return stub
+
+
+class TestErrorDiagnostics:
+    """Test error categorization and diagnosis"""
+
+    @pytest.mark.parametrize("error,expected", [
+        ("syntax error at or near 'SLECT'", ErrorType.SYNTAX_ERROR),
+        ('relation "products" does not exist', ErrorType.TABLE_NOT_FOUND),
+        ('column "pric" does not exist', ErrorType.COLUMN_NOT_FOUND),
+        ("operator does not exist: integer = text", ErrorType.TYPE_MISMATCH),
+        ("query timeout exceeded", ErrorType.TIMEOUT),
+        # Precedence follows error type, not where the keyword appears
+        ('relation "orders" has no column "totl"', ErrorType.COLUMN_NOT_FOUND),
+        ("connection reset by peer", ErrorType.UNKNOWN),
+    ])
+    def test_categorize_error(self, error, expected):
+        """Test error categorization by keyword"""
+        assert ErrorDiagnostics.categorize_error(error) == expected
+
+    @pytest.mark.parametrize("error", [
+        'table "products" does not exist',
+        'relation "products" does not exist',
+        "no such table: products",
+        "Table 'shop.products' doesn't exist",
+    ])
+    def test_extract_table_context(self, error):
         """Test extracting table name from error"""
-        error = 'table "products" does not exist'
         context = ErrorDiagnostics.extract_error_context(error, ErrorType.TABLE_NOT_FOUND)
         assert context["missing_table"] == "products"
 
-    def test_extract_column_context(self):
+    @pytest.mark.parametrize("error", [
+        'column "price" does not exist',
+        "no such column: price",
+        "Unknown column 'price' in 'field list'",
+    ])
+    def test_extract_column_context(self, error):
         """Test extracting column name from error"""
-        error = 'column "price" does not exist'
         context = ErrorDiagnostics.extract_error_context(error, ErrorType.COLUMN_NOT_FOUND)
         assert context["missing_column"] == "price"
 
@@ -67,18 +86,37 @@ class TestErrorDiagnostics:
         assert "products" in hints
         assert "schema" in hints.lower()
 
+    def test_diagnose(self):
+        """Test single-pass diagnosis matches the individual steps"""
+        error = 'column "pric" does not exist'
+        diagnosis = ErrorDiagnostics.diagnose(error)
+        assert diagnosis.error_type == ErrorType.COLUMN_NOT_FOUND
+        assert diagnosis.context["missing_column"] == "pric"
+        assert diagnosis.hints == ErrorDiagnostics.generate_fix_hints(
+            diagnosis.error_type, diagnosis.context
+        )
+
 
 class TestSelfCorrectingAgent:
     """Test self-correcting agent functionality"""
 
+    @pytest.fixture(autouse=True)
+    def clear_shared_caches(self):
+        """Empty the process-wide agent caches around each test"""
+        for cache in (_fixer_cache, _fix_memory):
+            cache.clear()
+        yield
+        for cache in (_fixer_cache, _fix_memory):
+            cache.clear()
+
     @pytest.fixture
     def mock_sql_generator(self):
         """Create a mock SQL generator"""
         generator = Mock()
         generator.settings = Mock()
         generator.settings.OLLAMA_MODEL = "test-model"
-        generator.generate_sql = AsyncMock()
-        generator.fix_sql_error = AsyncMock()
+        generator.generate_sql = returns(None)
+        generator.fix_sql_error = returns(None)
         return generator
 
     @pytest.fixture
@@ -90,137 +128,333 @@ class TestSelfCorrectingAgent:
             enable_diagnostics=True
         )
 
+    @pytest.fixture
+    def execute_query(self):
+        """Patch the agent's SQLExecutor and return its execute_query mock"""
+        with patch('src.llm.self_correcting_agent.SQLExecutor') as MockExecutor:
+            MockExecutor.return_value.execute_query = AsyncMock()
+            yield MockExecutor.return_value.execute_query
+
     @pytest.mark.asyncio
-    async def test_first_attempt_success(self, agent, mock_sql_generator):
+    async def test_first_attempt_success(self, agent, mock_sql_generator, execute_query):
         """Test successful query on first attempt"""
         # Mock SQL generation
-        mock_sql_generator.generate_sql.return_value = {
-            "sql": "SELECT * FROM products LIMIT 10",
-            "is_valid": True,
-            "is_read_only": True,
-            "warnings": [],
-            "model_used": "test-model"
-        }
+        mock_sql_generator.generate_sql = returns(generated("SELECT * FROM products LIMIT 10"))
 
         # Mock session with successful execution
         mock_session = Mock()
 
         # Mock executor result
-        with patch('src.llm.self_correcting_agent.SQLExecutor') as MockExecutor:
-            mock_executor = MockExecutor.return_value
-            mock_executor.execute_query = AsyncMock(return_value={
-                "success": True,
-                "data": [{"id": 1, "name": "Product 1"}],
-                "row_count": 1,
-                "execution_time_ms": 15.5
-            })
+        execute_query.return_value = {
+            "success": True,
+            "data": [{"id": 1, "name": "Product 1"}],
+            "row_count": 1,
+            "execution_time_ms": 15.5
+        }
 
-            result = await agent.generate_and_execute_with_retry(
-                question="Show me all products",
-                schema="Table: products (id, name, price)",
-                session=mock_session,
-                database_type="postgresql"
-            )
+        result = await agent.generate_and_execute_with_retry(
+            question="Show me all products",
+            schema="Table: products (id, name, price)",
+            session=mock_session,
+            database_type="postgresql"
+        )
 
-            assert result["success"] is True
-            assert result["total_attempts"] == 1
-            assert result["self_corrected"] is False
-            assert len(result["attempts"]) == 1
-            assert result["attempts"][0].success is True
+        assert result["success"] is True
+        assert result["total_attempts"] == 1
+        assert result["self_corrected"] is False
+        assert len(result["attempts"]) == 1
+        assert result["attempts"][0].success is True
 
     @pytest.mark.asyncio
-    async def test_error_then_success(self, agent, mock_sql_generator):
+    async def test_error_then_success(self, agent, mock_sql_generator, execute_query):
         """Test error on first attempt, then success after correction"""
         # First attempt - generate with error
-        mock_sql_generator.generate_sql.return_value = {
-            "sql": "SELECT * FROM prodcuts",  # Typo
-            "is_valid": True,
-            "is_read_only": True,
-            "warnings": [],
-            "model_used": "test-model"
-        }
+        mock_sql_generator.generate_sql = returns(generated("SELECT * FROM prodcuts"))  # Typo
 
         # Second attempt - fixed
-        mock_sql_generator.fix_sql_error.return_value = {
-            "sql": "SELECT * FROM products",  # Fixed
-            "is_valid": True,
-            "warnings": []
-        }
+        mock_sql_generator.fix_sql_error = returns(fixed("SELECT * FROM products"))  # Fixed
 
         mock_session = Mock()
 
-        with patch('src.llm.self_correcting_agent.SQLExecutor') as MockExecutor:
-            mock_executor = MockExecutor.return_value
-
-            # First execution fails, second succeeds
-            mock_executor.execute_query = AsyncMock(side_effect=[
-                {
-                    "success": False,
-                    "error": 'table "prodcuts" does not exist',
-                    "data": [],
-                    "row_count": 0
-                },
-                {
-                    "success": True,
-                    "data": [{"id": 1}],
-                    "row_count": 1,
-                    "execution_time_ms": 12.3
-                }
-            ])
+        # First execution fails, second succeeds
+        execute_query.side_effect = [
+            {
+                "success": False,
+                "error": 'table "prodcuts" does not exist',
+                "data": [],
+                "row_count": 0
+            },
+            {
+                "success": True,
+                "data": [{"id": 1}],
+                "row_count": 1,
+                "execution_time_ms": 12.3
+            }
+        ]
+
+        result = await agent.generate_and_execute_with_retry(
+            question="Show me products",
+            schema="Table: products (id, name)",
+            session=mock_session,
+            database_type="postgresql"
+        )
+
+        assert result["success"] is True
+        assert result["total_attempts"] == 2
+        assert result["self_corrected"] is True
+        assert len(result["attempts"]) == 2
+        assert result["attempts"][0].success is False
+        assert result["attempts"][1].success is True
+
+    @pytest.mark.asyncio
+    async def test_speculative_quick_fix(self, agent, mock_sql_generator, execute_query):
+        """Test borderline quick fix is executed while the LLM fix runs"""
+        mock_sql_generator.generate_sql = returns(generated("SELECT * FROM prod"))
+        mock_sql_generator.fix_sql_error = returns(fixed("SELECT * FROM llm_fixed"))
+
+        execute_query.side_effect = [
+            {
+                "success": False,
+                "error": 'table "prod" does not exist',
+                "data": [],
+                "row_count": 0
+            },
+            {
+                "success": True,
+                "data": [{"id": 1}],
+                "row_count": 1,
+                "execution_time_ms": 5.0
+            }
+        ]
+
+        result = await agent.generate_and_execute_with_retry(
+            question="Show me products",
+            schema='{"tables": {"products": {"columns": ["id", "name"]}}}',
+            session=Mock(),
+            database_type="postgresql"
+        )
+
+        assert result["success"] is True
+        assert result["sql"] == "SELECT * FROM products"
+        assert result["total_attempts"] == 2
+        assert execute_query.await_count == 2
 
+    @pytest.mark.asyncio
+    async def test_failed_speculative_fix_recorded(self, agent, mock_sql_generator, execute_query):
+        """Test a failed speculative quick fix is kept as an attempt"""
+        mock_sql_generator.generate_sql = returns(generated("SELECT * FROM prod"))
+        mock_sql_generator.fix_sql_error = returns(fixed("SELECT * FROM llm_fixed"))
+        execute_query.side_effect = [
+            {"success": False, "error": 'table "prod" does not exist', "data": [], "row_count": 0},
+            {"success": False, "error": "permission denied", "data": [], "row_count": 0},
+            {"success": True, "data": [{"id": 1}], "row_count": 1, "execution_time_ms": 5.0}
+        ]
+
+        result = await agent.generate_and_execute_with_retry(
+            question="Show me products",
+            schema='{"tables": {"products": {"columns": ["id", "name"]}}}',
+            session=Mock(),
+            database_type="postgresql"
+        )
+
+        assert result["success"] is True
+        assert result["sql"] == "SELECT * FROM llm_fixed"
+        assert result["total_attempts"] == 2
+        assert [(a.attempt_number, a.sql, a.success) for a in result["attempts"]] == [
+            (1, "SELECT * FROM prod", False),
+            (2, "SELECT * FROM products", False),
+            (2, "SELECT * FROM llm_fixed", True),
+        ]
+        assert result["attempts"][1].error_type == ErrorType.PERMISSION_DENIED
+
+    @pytest.mark.asyncio
+    async def test_speculative_fix_skips_writes(self, agent, mock_sql_generator, execute_query):
+        """Test a borderline quick fix of a write statement is never executed"""
+        mock_sql_generator.generate_sql = returns(generated("UPDATE prod SET name = 'x'"))
+        mock_sql_generator.fix_sql_error = returns(fixed("UPDATE llm_fixed SET name = 'x'"))
+        execute_query.side_effect = [
+            {"success": False, "error": 'table "prod" does not exist', "data": [], "row_count": 0},
+            {"success": True, "data": [{"id": 1}], "row_count": 1, "execution_time_ms": 5.0}
+        ]
+
+        result = await agent.generate_and_execute_with_retry(
+            question="Rename products",
+            schema='{"tables": {"products": {"columns": ["id", "name"]}}}',
+            session=Mock(),
+            database_type="postgresql",
+            allow_write=True
+        )
+
+        assert result["success"] is True
+        assert [call.kwargs["sql"] for call in execute_query.await_args_list] == [
+            "UPDATE prod SET name = 'x'",
+            "UPDATE llm_fixed SET name = 'x'",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_max_retries_exhausted(self, agent, mock_sql_generator, execute_query):
+        """Test failure after max retries"""
+        mock_sql_generator.generate_sql = returns(generated("SELECT * FROM bad_table"))
+
+        mock_sql_generator.fix_sql_error = returns(fixed("SELECT * FROM bad_table"))  # Still wrong
+
+        mock_session = Mock()
+
+        execute_query.return_value = {
+            "success": False,
+            "error": "table not found",
+            "data": [],
+            "row_count": 0
+        }
+
+        result = await agent.generate_and_execute_with_retry(
+            question="Show me data",
+            schema="Table: products (id)",
+            session=mock_session,
+            database_type="postgresql"
+        )
+
+        assert result["success"] is False
+        assert result["total_attempts"] == 3  # max_retries
+        assert result["error_preview"] == "table not found"
+        assert result["self_corrected"] is True
+        assert len(result["attempts"]) == 3
+
+    def test_executor_reused_per_write_mode(self, agent):
+        """Test executors are cached per allow_write flag"""
+        read_executor = agent._get_executor(False)
+        assert agent._get_executor(False) is read_executor
+        assert agent._get_executor(True) is not read_executor
+        assert agent._get_executor(True).allow_write is True
+
+    def test_schema_fixer_cached_per_schema(self, agent):
+        """Test schema-aware fixers are reused for the same schema"""
+        schema = '{"tables": {"products": {"columns": ["id", "price"]}}}'
+        fixer = agent._get_schema_fixer(schema)
+        assert fixer is not None
+        assert agent._get_schema_fixer(schema) is fixer
+
+        # Fixers are shared across agent instances
+        other_agent = SelfCorrectingSQLAgent(sql_generator=Mock())
+        assert other_agent._get_schema_fixer(schema) is fixer
+
+        # Equal dict schemas share a fixer
+        schema_dict = {"tables": {"products": {"columns": ["id", "price"]}}}
+        dict_fixer = agent._get_schema_fixer(schema_dict)
+        assert dict_fixer is not None
+        assert agent._get_schema_fixer(dict(schema_dict)) is dict_fixer
+
+        # Unparseable schemas are cached as None
+        assert agent._get_schema_fixer("Table: products (id)") is None
+        assert "Table: products (id)" in _fixer_cache
+
+    def test_schema_fixer_setter(self, agent):
+        """Test schema_fixer can still be assigned directly"""
+        fixer = Mock()
+        agent.schema_fixer = fixer
+        assert agent.schema_fixer is fixer
+        agent.schema_fixer = None
+
+    @pytest.mark.asyncio
+    async def test_learning_runs_in_background(self, agent):
+        """Test corrections are recorded by the background learner worker"""
+        agent.learner = Mock()
+        agent.learner.learn_from_correction = AsyncMock(return_value=1)
+
+        agent._enqueue_learning({
+            "error_type": ErrorType.TABLE_NOT_FOUND,
+            "original_sql": "SELECT * FROM prodcuts",
+            "original_error": 'table "prodcuts" does not exist',
+            "corrected_sql": "SELECT * FROM products",
+            "database_type": "postgresql",
+            "was_successful": True
+        })
+        await agent.aclose()
+
+        agent.learner.learn_from_correction.assert_awaited_once()
+        assert agent._learn_task is None
+
+    @pytest.mark.asyncio
+    async def test_learning_worker_stops_with_agent_scope(
+        self, mock_sql_generator, execute_query
+    ):
+        """Test leaving the agent's scope drains learner writes and stops the worker"""
+        mock_sql_generator.generate_sql = returns(generated("SELECT * FROM prodcuts"))
+        mock_sql_generator.fix_sql_error = returns(fixed("SELECT * FROM products"))
+        execute_query.side_effect = [
+            {"success": False, "error": 'table "prodcuts" does not exist', "data": [], "row_count": 0},
+            {"success": True, "data": [{"id": 1}], "row_count": 1, "execution_time_ms": 1.0}
+        ]
+
+        async with SelfCorrectingSQLAgent(sql_generator=mock_sql_generator) as agent:
+            agent.learner = CorrectionLearner(db_session=Mock())
+            agent.learner.find_applicable_corrections = AsyncMock(return_value=[])
+            agent.learner.learn_from_correction = AsyncMock(return_value=1)
             result = await agent.generate_and_execute_with_retry(
                 question="Show me products",
                 schema="Table: products (id, name)",
-                session=mock_session,
+                session=Mock(),
                 database_type="postgresql"
             )
-
+            worker = agent._learn_task
             assert result["success"] is True
-            assert result["total_attempts"] == 2
             assert result["self_corrected"] is True
-            assert len(result["attempts"]) == 2
-            assert result["attempts"][0].success is False
-            assert result["attempts"][1].success is True
-
-    @pytest.mark.asyncio
-    async def test_max_retries_exhausted(self, agent, mock_sql_generator):
-        """Test failure after max retries"""
-        mock_sql_generator.generate_sql.return_value = {
-            "sql": "SELECT * FROM bad_table",
-            "is_valid": True,
-            "is_read_only": True,
-            "warnings": [],
-            "model_used": "test-model"
-        }
-
-        mock_sql_generator.fix_sql_error.return_value = {
-            "sql": "SELECT * FROM bad_table",  # Still wrong
-            "is_valid": True,
-            "warnings": []
-        }
+            assert worker is not None
+
+        assert worker.done()
+        assert agent._learn_task is None
+        agent.learner.learn_from_correction.assert_awaited_once()
+
+    def test_fix_memory_replays_on_same_query_shape(self, agent):
+        """Test remembered fixes are replayed with the new query's literals"""
+        agent._remember_fix(
+            error_type=ErrorType.TABLE_NOT_FOUND,
+            failed_sql="SELECT * FROM prodcuts WHERE price > 10 AND name = 'a'",
+            corrected_sql="SELECT * FROM products WHERE price > 10 AND name = 'a'",
+            database_type="postgresql",
+            schema_key="shop"
+        )
 
-        mock_session = Mock()
+        # Remembered fixes are shared across agent instances
+        other_agent = SelfCorrectingSQLAgent(sql_generator=Mock())
+        fixed = other_agent._recall_fix(
+            "select * from prodcuts   WHERE price > 25 AND name = 'b'",
+            ErrorType.TABLE_NOT_FOUND,
+            "postgresql",
+            "shop"
+        )
+        assert fixed == "SELECT * FROM products WHERE price > 25 AND name = 'b'"
 
-        with patch('src.llm.self_correcting_agent.SQLExecutor') as MockExecutor:
-            mock_executor = MockExecutor.return_value
-            mock_executor.execute_query = AsyncMock(return_value={
-                "success": False,
-                "error": "table not found",
-                "data": [],
-                "row_count": 0
-            })
+        # ...but never replayed on another database type or schema
+        for database_type, schema_key in (("mysql", "shop"), ("postgresql", "crm")):
+            assert agent._recall_fix(
+                "SELECT * FROM prodcuts WHERE price > 25 AND name = 'b'",
+                ErrorType.TABLE_NOT_FOUND,
+                database_type,
+                schema_key
+            ) is None
 
+    @pytest.mark.asyncio
+    async def test_fix_memory_replayed_across_requests(self, mock_sql_generator, execute_query):
+        """Test a fix learned by one request's agent skips the LLM for the next"""
+        schema = "Table: products (id, name)"
+        mock_sql_generator.generate_sql = returns(generated("SELECT * FROM prodcuts"))
+        mock_sql_generator.fix_sql_error = AsyncMock(return_value=fixed("SELECT * FROM products"))
+        failure = {"success": False, "error": 'table "prodcuts" does not exist', "data": [], "row_count": 0}
+        success = {"success": True, "data": [{"id": 1}], "row_count": 1, "execution_time_ms": 1.0}
+        execute_query.side_effect = [failure, success, failure, success]
+
+        for _ in range(2):
+            agent = SelfCorrectingSQLAgent(sql_generator=mock_sql_generator, enable_learning=False)
             result = await agent.generate_and_execute_with_retry(
-                question="Show me data",
-                schema="Table: products (id)",
-                session=mock_session,
+                question="Show me products",
+                schema=schema,
+                session=Mock(),
                 database_type="postgresql"
             )
+            assert result["sql"] == "SELECT * FROM products"
 
-            assert result["success"] is False
-            assert result["total_attempts"] == 3  # max_retries
-            assert result["self_corrected"] is True
-            assert len(result["attempts"]) == 3
+        mock_sql_generator.fix_sql_error.assert_awaited_once()
 
     def test_correction_summary_first_try(self, agent):
         """Test summary for first-try success"""
@@ -295,6 +529,22 @@ class TestSelfCorrectingAgent:
         assert report["attempts"][0]["success"] is False
         assert report["attempts"][1]["success"] is True
 
+    def test_attempt_previews(self):
+        """Test SQL/error previews are truncated for reports"""
+        attempt = CorrectionAttempt(
+            attempt_number=1,
+            sql="SELECT " + "x, " * 100 + "y FROM t",
+            error="e" * 300,
+            error_type=ErrorType.UNKNOWN,
+            success=False,
+            execution_time_ms=None,
+            row_count=None
+        )
+        assert attempt.sql_preview.endswith("...")
+        assert len(attempt.sql_preview) == 203
+        assert len(attempt.error_preview) == 200
+        assert not hasattr(attempt, "__dict__")
+
 
 class TestIntegration:
     """Integration tests (requires actual database)"""
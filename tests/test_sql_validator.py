@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for SQL Validator
+
+Run with: pytest tests/test_sql_validator.py -v
+"""
+import pytest
+from unittest.mock import MagicMock
+from src.llm.sql_generator import SQLGenerator, SQLValidator
+
+
+class TestReadOnly:
+    """Test read-only detection"""
+
+    def test_select_is_read_only(self):
+        """Test SELECT queries are read-only"""
+        assert SQLValidator.is_read_only("  select * from products") is True
+
+    def test_write_is_not_read_only(self):
+        """Test write queries are not read-only"""
+        assert SQLValidator.is_read_only("DELETE FROM products") is False
+        assert SQLValidator.is_read_only("SELECTED") is False
+        assert SQLValidator.is_read_only("SELECT") is False
+
+    def test_select_followed_by_newline(self):
+        """Test any whitespace after SELECT counts"""
+        assert SQLValidator.is_read_only("\n\tSELECT\n*\nFROM products") is True
+
+
+class TestDangerousOperations:
+    """Test dangerous keyword detection"""
+
+    def test_no_dangerous_operations(self):
+        """Test plain SELECT has no dangerous operations"""
+        assert SQLValidator.contains_dangerous_operations("SELECT * FROM products") == []
+
+    def test_detects_keywords_case_insensitively(self):
+        """Test keywords are found regardless of case, in keyword order"""
+        found = SQLValidator.contains_dangerous_operations(
+            "update products set x = 1; drop table products"
+        )
+        assert found == ["DROP", "UPDATE"]
+
+    def test_word_boundaries(self):
+        """Test keywords inside identifiers are not flagged"""
+        assert SQLValidator.contains_dangerous_operations(
+            "SELECT created_at, updated_by FROM dropped_items"
+        ) == []
+
+    def test_exec_and_execute(self):
+        """Test EXEC and EXECUTE are reported separately"""
+        assert SQLValidator.contains_dangerous_operations("EXECUTE proc") == ["EXECUTE"]
+        assert SQLValidator.contains_dangerous_operations("EXEC proc") == ["EXEC"]
+
+
+class TestSyntaxValidation:
+    """Test basic syntax validation"""
+
+    def test_valid_select(self):
+        """Test a valid SELECT passes"""
+        assert SQLValidator.validate_sql_syntax("SELECT id FROM products") == (True, None)
+
+    def test_empty_query(self):
+        """Test empty queries are rejected"""
+        assert SQLValidator.validate_sql_syntax("   ") == (False, "Empty SQL query")
+
+    def test_no_command(self):
+        """Test text without a SQL command is rejected"""
+        assert SQLValidator.validate_sql_syntax("hello world") == (
+            False, "No valid SQL command found"
+        )
+
+    def test_command_after_cte(self):
+        """Test a command not in first position is still found"""
+        sql = "WITH recent AS (SELECT id FROM orders) SELECT * FROM recent"
+        assert SQLValidator.validate_sql_syntax(sql) == (True, None)
+
+    def test_unbalanced_parentheses(self):
+        """Test unbalanced parentheses are rejected"""
+        assert SQLValidator.validate_sql_syntax("SELECT COUNT(id FROM products") == (
+            False, "Unbalanced parentheses"
+        )
+
+    @pytest.mark.parametrize("sql", [
+        "SELECT * FROM users; DROP TABLE users",
+        "SELECT * FROM users -- comment",
+        "SELECT * FROM users /* comment */",
+        "SELECT id FROM a UNION SELECT password FROM users",
+        "SELECT * FROM users WHERE name = 'x' OR 1=1",
+        "SELECT * FROM users WHERE name = 'x' OR '1'='1'",
+    ])
+    def test_suspicious_patterns(self, sql):
+        """Test injection patterns are rejected"""
+        is_valid, error = SQLValidator.validate_sql_syntax(sql)
+        assert is_valid is False
+        assert error.startswith("Suspicious pattern detected")
+
+    def test_suspicious_pattern_reported(self):
+        """Test the error names the pattern that matched"""
+        assert SQLValidator.validate_sql_syntax("SELECT a FROM t UNION SELECT b FROM u") == (
+            False, r"Suspicious pattern detected: UNION\s+SELECT"
+        )
+
+
+class TestCleanSqlOutput:
+    """Test extraction of SQL from LLM output"""
+
+    def test_already_clean(self):
+        """Test clean SQL passes through unchanged"""
+        assert SQLValidator.clean_sql_output("SELECT * FROM products;") == "SELECT * FROM products;"
+
+    def test_markdown_fence(self):
+        """Test markdown code fences are removed"""
+        text = "```sql\nSELECT *\nFROM products;\n```"
+        assert SQLValidator.clean_sql_output(text) == "SELECT * FROM products;"
+
+    def test_prefix_and_inline_db_type(self):
+        """Test answer prefixes and inline database names are removed"""
+        assert SQLValidator.clean_sql_output("SQL: SELECT 1;") == "SELECT 1;"
+        assert SQLValidator.clean_sql_output("PostgreSQL SELECT 1;") == "SELECT 1;"
+
+    @pytest.mark.parametrize("text,expected", [
+        ("SQL Query: SELECT 1;", "SELECT 1;"),
+        ("query: SELECT 1;", "SELECT 1;"),
+        ("Answer: SELECT 1;", "SELECT 1;"),
+        ("SQLite SELECT 1;", "SELECT 1;"),
+        ("mysql SELECT 1;", "SELECT 1;"),
+        ("Use mongodb SELECT 1;", "Use SELECT 1;"),
+    ])
+    def test_prefix_variants(self, text, expected):
+        """Test every known prefix and database mention is stripped"""
+        assert SQLValidator.clean_sql_output(text) == expected
+
+    def test_stops_at_first_statement(self):
+        """Test comments are skipped and output stops after the first statement"""
+        text = "-- get products\nSELECT  *\n  FROM products;\nSELECT 2;"
+        assert SQLValidator.clean_sql_output(text) == "SELECT * FROM products;"
+
+
+class TestMultiDbOutputParsing:
+    """Test splitting multi-database LLM output into per-database queries"""
+
+    def test_database_markers(self):
+        """Test markers are case-insensitive and fences/comments are skipped"""
+        generator = SQLGenerator(ollama_client=MagicMock())
+        raw = (
+            "DATABASE: shop\n```sql\nSELECT *\nFROM orders;\n```\n"
+            "database:   crm\n-- customers\nSELECT 1;"
+        )
+        assert generator._parse_multi_db_output(raw) == [
+            {"database_name": "shop", "sql": "SELECT * FROM orders;"},
+            {"database_name": "crm", "sql": "SELECT 1;"},
+        ]
+
+    def test_no_markers(self):
+        """Test output without markers becomes a single query"""
+        generator = SQLGenerator(ollama_client=MagicMock())
+        assert generator._parse_multi_db_output("SELECT 1;") == [
+            {"database_name": None, "sql": "SELECT 1;"}
+        ]
+
+
+class TestAnalyze:
+    """Test the combined validator check"""
+
+    @pytest.mark.parametrize("sql", [
+        "  SELECT id FROM products  ",
+        "DELETE FROM products",
+        "SELECT * FROM users; DROP TABLE users",
+        "hello world",
+        "",
+    ])
+    def test_matches_individual_checks(self, sql):
+        """Test analyze agrees with the separate validator methods"""
+        analysis = SQLValidator.analyze(sql)
+        assert (analysis.is_valid, analysis.error) == SQLValidator.validate_sql_syntax(sql)
+        assert analysis.is_read_only == SQLValidator.is_read_only(sql)
+        assert analysis.dangerous_operations == SQLValidator.contains_dangerous_operations(sql)
+        assert analysis.sql == sql.strip()
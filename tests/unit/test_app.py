@@ -1,38 +1,53 @@
 """Test application setup"""
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
 from fastapi.testclient import TestClient
 from src.main import app
 from src.api.dependencies.common import get_db_manager, get_cache, get_sql_generator
 
 
-def test_health_check():
-    # Mock database manager
-    mock_db_instance = MagicMock()
-    mock_db_instance.async_engine = MagicMock()
-    mock_db_instance.health_check = AsyncMock(return_value=True)
+@pytest.fixture(scope="module")
+def client():
+    """Create one test client for the module"""
+    # Not entered as a context manager: the lifespan would connect to real services
+    return TestClient(app)
 
-    # Mock cache
-    mock_cache_instance = MagicMock()
-    mock_cache_instance.redis = MagicMock()
-    mock_cache_instance.health_check = AsyncMock(return_value=True)
 
-    # Mock LLM
-    mock_llm_instance = MagicMock()
-    mock_llm_instance.ollama = MagicMock()
-    mock_llm_instance.ollama.client = MagicMock()
-    mock_llm_instance.ollama.health_check = AsyncMock(return_value=True)
+async def _healthy():
+    """Health check stub that always passes"""
+    return True
+
+
+@pytest.fixture
+def mock_services():
+    """Override the service dependencies with healthy stand-ins"""
+    # Stand-ins exposing only what /health reads
+    mock_db_instance = SimpleNamespace(async_engine=object(), health_check=_healthy)
+    mock_cache_instance = SimpleNamespace(redis=object(), health_check=_healthy)
+    mock_llm_instance = SimpleNamespace(
+        ollama=SimpleNamespace(client=object(), health_check=_healthy)
+    )
 
     # Override dependencies
     app.dependency_overrides[get_db_manager] = lambda: mock_db_instance
     app.dependency_overrides[get_cache] = lambda: mock_cache_instance
     app.dependency_overrides[get_sql_generator] = lambda: mock_llm_instance
 
-    try:
-        client = TestClient(app)
-        response = client.get("/health")
-        assert response.status_code == 200
-        assert response.json()["status"] == "healthy"
-    finally:
-        # Clean up overrides
-        app.dependency_overrides.clear()
\ No newline at end of file
+    yield mock_db_instance, mock_cache_instance, mock_llm_instance
+
+    # Clean up overrides
+    app.dependency_overrides.clear()
+
+
+def test_health_check(client, mock_services):
+    """Test /health reports healthy when every service is up"""
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+
+def test_openapi_schema_cached():
+    """Test the OpenAPI schema is built once and keeps the model examples"""
+    schema = app.openapi()
+    assert app.openapi() is schema
+    assert schema["components"]["schemas"]["QueryResponse"]["example"]["query_id"] == 123